@@ -0,0 +1,196 @@
+"""Local stand-in for the RetroAchievements web API.
+
+Replays the JSON fixtures in benchmarks/fixtures with configurable latency and
+error rates, and counts every request it answers. It runs in its own process
+so its work doesn't show up in the integration's timings or memory.
+
+    python -m benchmarks.fake_server --port 8765 --latency 0.08 --error-rate 0.02
+
+Besides /API/<endpoint>.php it serves:
+    GET  /_stats   request counts and bytes per endpoint
+    POST /_reset   zero the counters and forget per-user state
+"""
+import argparse
+import asyncio
+import copy
+import json
+import random
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aiohttp import web
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Endpoints whose fixture describes one game; the requested ID is patched in
+GAME_ID_PARAMS = {
+    "API_GetGame": "i",
+    "API_GetGameInfoAndUserProgress": "g",
+}
+
+
+def load_fixtures(path=FIXTURES_DIR):
+    return {fixture.stem: json.loads(fixture.read_text()) for fixture in sorted(Path(path).glob("API_*.json"))}
+
+
+class FakeRetroAchievementsServer:
+    def __init__(self, fixtures, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0, churn=0.0, seed=None):
+        self._fixtures = fixtures
+        self._latency = latency
+        self._jitter = jitter
+        self._error_rate = error_rate
+        self._rate_limit_rate = rate_limit_rate
+        self._churn = churn
+        self._random = random.Random(seed)
+        self._recent = {}
+        self._follows = None
+        self.calls = Counter()
+        self.errors = Counter()
+        self.bytes = Counter()
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/API/{endpoint}.php", self._handle_api)
+        app.router.add_get("/_stats", self._handle_stats)
+        app.router.add_post("/_reset", self._handle_reset)
+        return app
+
+    async def _handle_api(self, request):
+        endpoint = request.match_info["endpoint"]
+        self.calls[endpoint] += 1
+        if self._latency or self._jitter:
+            await asyncio.sleep(self._latency + self._random.uniform(0, self._jitter))
+
+        roll = self._random.random()
+        if roll < self._rate_limit_rate:
+            self.errors[endpoint] += 1
+            return web.json_response({"message": "Too Many Attempts."}, status=429, headers={"Retry-After": "60"})
+        if roll < self._rate_limit_rate + self._error_rate:
+            self.errors[endpoint] += 1
+            return web.json_response({"message": "Server Error"}, status=503)
+
+        if endpoint not in self._fixtures:
+            self.errors[endpoint] += 1
+            return web.json_response({"message": f"No fixture for {endpoint}"}, status=404)
+
+        body = json.dumps(self._payload(endpoint, request.query))
+        self.bytes[endpoint] += len(body)
+        return web.Response(text=body, content_type="application/json")
+
+    def _payload(self, endpoint, query):
+        fixture = self._fixtures[endpoint]
+        if endpoint == "API_GetUserSummary":
+            return self._summary(fixture, query.get("u", ""), int(query.get("g", 0)))
+        if endpoint == "API_GetUserRecentlyPlayedGames":
+            return self._games(query.get("u", ""))[:int(query.get("c", 10))]
+        if endpoint == "API_GetUserProgress":
+            template = next(iter(fixture.values()))
+            games = {str(game["GameID"]): game for game in self._games(query.get("u", ""))}
+            return {
+                game_id: {key: games.get(game_id, template).get(key, value) for key, value in template.items()}
+                for game_id in query.get("i", "").split(",") if game_id
+            }
+        if endpoint == "API_GetAchievementsEarnedBetween":
+            start = datetime.fromtimestamp(int(query.get("f", 0)), timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            end = datetime.fromtimestamp(int(query.get("t", 0)), timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            return [unlock for unlock in fixture if start <= unlock["Date"] <= end]
+        if endpoint == "API_GetUsersIFollow":
+            follows = self._followed()
+            offset, count = int(query.get("o", 0)), int(query.get("c", 100))
+            page = follows[offset:offset + count]
+            return {"Count": len(page), "Total": len(follows), "Results": page}
+        if endpoint == "API_GetUserProfile":
+            follow = next((f for f in self._followed() if f["User"] == query.get("u")), {})
+            return {
+                **fixture,
+                "User": query.get("u", fixture.get("User")),
+                "UserPic": f"/UserPic/{query.get('u', fixture.get('User'))}.png",
+                "TotalPoints": follow.get("Points", fixture.get("TotalPoints")),
+                "TotalSoftcorePoints": follow.get("PointsSoftcore", fixture.get("TotalSoftcorePoints")),
+            }
+        if endpoint in GAME_ID_PARAMS:
+            game_id = int(query.get(GAME_ID_PARAMS[endpoint], 0))
+            return {**fixture, "ID": game_id}
+        return fixture
+
+    def _games(self, username):
+        """Each user gets their own copy of the recent games, newest first."""
+        games = self._recent.get(username)
+        if games is None:
+            games = self._recent[username] = copy.deepcopy(self._fixtures["API_GetUserRecentlyPlayedGames"])
+        return games
+
+    def _followed(self):
+        """Everyone the caller follows; with churn, some of them unlock something between calls."""
+        if self._follows is None:
+            self._follows = copy.deepcopy(self._fixtures["API_GetUsersIFollow"]["Results"])
+        elif self._churn:
+            for follow in self._follows:
+                if self._random.random() < self._churn:
+                    follow["Points"] += 5
+        return self._follows
+
+    def _summary(self, fixture, username, recent_count):
+        """The user's activity moves on here, since every refresh starts with a summary."""
+        games = self._games(username)
+        if self._churn:
+            now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            for game in games:
+                if self._random.random() < self._churn:
+                    game["LastPlayed"] = now
+                    game["NumAchieved"] = game.get("NumAchieved", 0) + 1
+                    game["ScoreAchieved"] = game.get("ScoreAchieved", 0) + 5
+            games.sort(key=lambda game: game["LastPlayed"], reverse=True)
+        base_score = sum(game.get("ScoreAchieved", 0) for game in self._fixtures["API_GetUserRecentlyPlayedGames"])
+        return {
+            **fixture,
+            "User": username or fixture.get("User"),
+            "TotalPoints": fixture.get("TotalPoints", 0) + sum(game.get("ScoreAchieved", 0) for game in games) - base_score,
+            "LastGameID": games[0]["GameID"] if games else None,
+            "RecentlyPlayed": games[:recent_count],
+        }
+
+    async def _handle_stats(self, request):
+        return web.json_response({
+            "calls": dict(self.calls),
+            "errors": dict(self.errors),
+            "bytes": dict(self.bytes),
+        })
+
+    async def _handle_reset(self, request):
+        self.calls.clear()
+        self.errors.clear()
+        self.bytes.clear()
+        self._recent.clear()
+        self._follows = None
+        return web.json_response({})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, uniformly")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--churn", type=float, default=0.0, help="chance each recent game changes per summary request")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = FakeRetroAchievementsServer(
+        load_fixtures(args.fixtures),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        churn=args.churn,
+        seed=args.seed,
+    )
+    web.run_app(server.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
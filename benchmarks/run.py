@@ -0,0 +1,280 @@
+"""Measure what a refresh costs against the local fake API.
+
+Starts benchmarks.fake_server in a subprocess, then for every combination of
+--accounts and --games builds a fresh Home Assistant instance with one
+coordinator per account sharing a single client, and refreshes them all
+together: one cold refresh (empty caches) followed by --refreshes warm ones.
+
+Reported per scenario:
+    calls      API requests per refresh (cold / mean warm)
+    wall       refresh wall time in ms (cold / median warm)
+    lag        worst event-loop stall seen while refreshing, in ms
+    peak       tracemalloc peak above the pre-refresh baseline, in KiB
+    retained   memory still held after the last refresh, in KiB
+    failed     refreshes that ended with last_update_success False
+
+Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks.run --games 1 3 15 --accounts 1 3 --latency 0.08
+"""
+import argparse
+import asyncio
+import gc
+import inspect
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import aiohttp
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.retroachievements.api import RetroAchievementsClient
+from custom_components.retroachievements.cache import ConsoleCatalog, GameMetadataCache
+from custom_components.retroachievements.const import (
+    CONF_API_KEY,
+    CONF_FRIENDS,
+    CONF_HISTORY,
+    CONF_NUM_GAMES,
+    CONF_UNLOCK_FEED,
+    CONF_USERNAME,
+    DOMAIN,
+)
+from custom_components.retroachievements.coordinator import RetroAchievementsCoordinator
+
+LAG_PROBE_INTERVAL = 0.005
+SERVER_START_TIMEOUT = 10
+
+
+class LoopLagMonitor:
+    """Sleeps in short steps and records how late the loop wakes it up."""
+
+    def __init__(self, interval=LAG_PROBE_INTERVAL):
+        self._interval = interval
+        self._task = None
+        self.max_lag = 0.0
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            self.max_lag = max(self.max_lag, loop.time() - start - self._interval)
+
+    def __enter__(self):
+        self.max_lag = 0.0
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _make_entry(data):
+    # ConfigEntry's required arguments differ between Home Assistant releases
+    kwargs = {
+        "version": 1,
+        "minor_version": 1,
+        "domain": DOMAIN,
+        "title": data[CONF_USERNAME],
+        "data": data,
+        "source": "user",
+        "options": {},
+        "unique_id": data[CONF_USERNAME],
+        "discovery_keys": {},
+        "subentries_data": None,
+    }
+    params = inspect.signature(ConfigEntry).parameters
+    return ConfigEntry(**{key: value for key, value in kwargs.items() if key in params})
+
+
+async def _server_stats(session, server_url):
+    async with session.get(f"{server_url}/_stats") as resp:
+        return await resp.json()
+
+
+async def _start_server(args, port):
+    cmd = [
+        sys.executable, "-m", "benchmarks.fake_server",
+        "--port", str(port),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate),
+        "--churn", str(args.churn),
+    ]
+    if args.seed is not None:
+        cmd += ["--seed", str(args.seed)]
+    proc = subprocess.Popen(cmd, cwd=Path(__file__).parent.parent)
+
+    server_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                await _server_stats(session, server_url)
+                return proc, server_url
+            except aiohttp.ClientConnectionError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    proc.terminate()
+                    raise RuntimeError("fake API server did not start")
+                await asyncio.sleep(0.1)
+
+
+async def run_scenario(args, server_url, num_accounts, num_games):
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{server_url}/_reset"):
+            pass
+
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = HomeAssistant(config_dir)
+            await hass.async_start()
+
+            gc.collect()
+            memory_base = tracemalloc.get_traced_memory()[0] if args.memory else 0
+            game_cache = GameMetadataCache(hass)
+            await game_cache.async_load()
+            console_catalog = ConsoleCatalog(hass)
+            await console_catalog.async_load()
+            client = RetroAchievementsClient(hass, args.rpm, base_url=f"{server_url}/API")
+            coordinators = [
+                RetroAchievementsCoordinator(
+                    hass,
+                    _make_entry({
+                        CONF_USERNAME: f"bench{n}",
+                        CONF_API_KEY: f"key{n}",
+                        CONF_NUM_GAMES: num_games,
+                        CONF_UNLOCK_FEED: args.unlock_feed,
+                        CONF_HISTORY: args.history,
+                        CONF_FRIENDS: args.friends,
+                    }),
+                    client,
+                    game_cache,
+                    console_catalog,
+                )
+                for n in range(num_accounts)
+            ]
+
+            refreshes = []
+            seen_calls = 0
+            for _ in range(args.refreshes + 1):
+                if args.memory:
+                    tracemalloc.reset_peak()
+                    before = tracemalloc.get_traced_memory()[0]
+                with LoopLagMonitor() as lag:
+                    start = time.perf_counter()
+                    await asyncio.gather(*(
+                        refresh.async_refresh()
+                        for coordinator in coordinators
+                        for refresh in (coordinator, coordinator.friends)
+                        if refresh is not None
+                    ))
+                    wall = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] - before if args.memory else 0
+
+                stats = await _server_stats(session, server_url)
+                total_calls = sum(stats["calls"].values())
+                refreshes.append({
+                    "calls": total_calls - seen_calls,
+                    "wall_ms": wall * 1000,
+                    "lag_ms": lag.max_lag * 1000,
+                    "peak_kib": peak / 1024,
+                    "failed": sum(not coordinator.last_update_success for coordinator in coordinators),
+                })
+                seen_calls = total_calls
+
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0] - memory_base if args.memory else 0
+            for coordinator in coordinators:
+                await coordinator.async_close()
+            await hass.async_stop()
+
+    cold, warm = refreshes[0], refreshes[1:] or refreshes[:1]
+    return {
+        "accounts": num_accounts,
+        "games": num_games,
+        "cold_calls": cold["calls"],
+        "warm_calls": statistics.mean(r["calls"] for r in warm),
+        "cold_wall_ms": cold["wall_ms"],
+        "warm_wall_ms": statistics.median(r["wall_ms"] for r in warm),
+        "max_lag_ms": max(r["lag_ms"] for r in refreshes),
+        "peak_kib": max(r["peak_kib"] for r in refreshes),
+        "retained_kib": retained / 1024,
+        "failed": sum(r["failed"] for r in refreshes),
+        "calls_by_endpoint": stats["calls"],
+        "bytes_by_endpoint": stats["bytes"],
+    }
+
+
+def _print_table(results):
+    header = (
+        f"{'accounts':>8} {'games':>5} {'calls':>11} {'wall ms':>15} "
+        f"{'lag ms':>7} {'peak KiB':>9} {'retained KiB':>12} {'failed':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        calls = f"{r['cold_calls']}/{r['warm_calls']:.1f}"
+        wall = f"{r['cold_wall_ms']:.0f}/{r['warm_wall_ms']:.0f}"
+        print(
+            f"{r['accounts']:>8} {r['games']:>5} {calls:>11} {wall:>15} "
+            f"{r['max_lag_ms']:>7.1f} {r['peak_kib']:>9.0f} {r['retained_kib']:>12.0f} {r['failed']:>6}"
+        )
+
+
+async def main(args):
+    if args.memory:
+        tracemalloc.start()
+    proc, server_url = await _start_server(args, args.port or _free_port())
+    try:
+        results = [
+            await run_scenario(args, server_url, num_accounts, num_games)
+            for num_accounts in args.accounts
+            for num_games in args.games
+        ]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, nargs="+", default=[1, 3, 15], help="tracked games per account")
+    parser.add_argument("--accounts", type=int, nargs="+", default=[1, 3], help="config entries sharing one client")
+    parser.add_argument("--refreshes", type=int, default=5, help="warm refreshes after the cold one")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the fake API waits per request")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--churn", type=float, default=0.1, help="chance each recent game changes per refresh")
+    parser.add_argument("--rpm", type=int, default=600, help="request budget; lower it to include throttling")
+    parser.add_argument("--unlock-feed", action="store_true", help="track unlocks with the recent achievements feed")
+    parser.add_argument("--history", action="store_true", help="keep the local unlock history index")
+    parser.add_argument("--friends", action="store_true", help="also track the users each account follows")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, help="fake API port, a free one by default")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="skip tracemalloc, which slows every allocation")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
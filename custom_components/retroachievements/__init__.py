@@ -1,23 +1,77 @@
 """RetroAchievements integration."""
+from datetime import timedelta
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .api import RetroAchievementsClient
+from .cache import ConsoleCatalog, GameMetadataCache
+from .const import (
+    CONF_FRIENDS,
+    CONF_METADATA_INTERVAL,
+    CONF_NUM_GAMES,
+    CONF_REQUESTS_PER_MINUTE,
+    DATA_API_SENSORS_ENTRY,
+    DATA_CLIENT,
+    DATA_CONSOLE_CATALOG,
+    DATA_GAME_CACHE,
+    DATA_IMAGE_CACHE,
+    DEFAULT_METADATA_INTERVAL,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DOMAIN,
+)
+from .coordinator import RetroAchievementsCoordinator, entry_setting, snapshot_store
+from .feed import RecentUnlockFeed
+from .history import AchievementHistory
+from .images import ImageCache, RetroAchievementsImageView
+from .services import async_setup_services
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up RetroAchievements (YAML not supported)."""
+    game_cache = GameMetadataCache(hass)
+    await game_cache.async_load()
+    hass.data.setdefault(DOMAIN, {})[DATA_GAME_CACHE] = game_cache
+    console_catalog = ConsoleCatalog(hass)
+    await console_catalog.async_load()
+    hass.data[DOMAIN][DATA_CONSOLE_CATALOG] = console_catalog
+    hass.data[DOMAIN][DATA_CLIENT] = RetroAchievementsClient(hass)
+
+    image_cache = ImageCache(hass)
+    await image_cache.async_load()
+    hass.data[DOMAIN][DATA_IMAGE_CACHE] = image_cache
+    hass.http.register_view(RetroAchievementsImageView(image_cache))
+
+    await async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up RetroAchievements from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
+    _update_shared_settings(hass)
+
+    coordinator = RetroAchievementsCoordinator(
+        hass,
+        entry,
+        hass.data[DOMAIN][DATA_CLIENT],
+        hass.data[DOMAIN][DATA_GAME_CACHE],
+        hass.data[DOMAIN][DATA_CONSOLE_CATALOG],
+    )
+    # Entities start from the last saved snapshot; the first real refresh
+    # runs in the background so a slow or unreachable API can't hold up startup
+    await coordinator.async_restore()
+
+    hass.data[DOMAIN][entry.entry_id] = coordinator
 
     # Works on new HA versions
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+    entry.async_create_background_task(hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}")
+    if coordinator.friends is not None:
+        entry.async_create_background_task(
+            hass, coordinator.friends.async_refresh(), f"{DOMAIN} first friends refresh {entry.entry_id}"
+        )
     return True
 
 
@@ -25,5 +79,53 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_close()
+        if hass.data[DOMAIN].get(DATA_API_SENSORS_ENTRY) == entry.entry_id:
+            del hass.data[DOMAIN][DATA_API_SENSORS_ENTRY]
+            _hand_over_api_sensors(hass)
     return unload_ok
+
+
+def _hand_over_api_sensors(hass: HomeAssistant):
+    """Reload another loaded entry so it sets up the shared API sensors."""
+    if hass.is_stopping:
+        return
+    for other in hass.config_entries.async_entries(DOMAIN):
+        if other.entry_id in hass.data[DOMAIN]:
+            hass.async_create_task(hass.config_entries.async_reload(other.entry_id))
+            return
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the files kept for a removed entry."""
+    await snapshot_store(hass, entry.entry_id).async_remove()
+    await RecentUnlockFeed(hass, entry.entry_id).async_remove()
+    await AchievementHistory(hass, entry.entry_id).async_remove()
+
+
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry):
+    """Apply new options in place; only adding or removing sensors needs a reload."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    if entry_setting(entry, CONF_NUM_GAMES, 5) != coordinator.num_games or bool(
+        entry_setting(entry, CONF_FRIENDS)
+    ) != (coordinator.friends is not None):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    coordinator.apply_options(entry)
+    _update_shared_settings(hass)
+    # Refresh now so the new poll interval is used from here on
+    await coordinator.async_request_refresh()
+
+
+def _update_shared_settings(hass: HomeAssistant):
+    """Apply the strictest setting of all entries to what they share.
+
+    The request budget takes the lowest requests per minute, the game
+    metadata cache the shortest lifetime.
+    """
+    entries = hass.config_entries.async_entries(DOMAIN)
+    rates = [entry.data.get(CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE) for entry in entries]
+    hass.data[DOMAIN][DATA_CLIENT].budget.set_rate(min(rates, default=DEFAULT_REQUESTS_PER_MINUTE))
+    ttls = [entry_setting(entry, CONF_METADATA_INTERVAL, DEFAULT_METADATA_INTERVAL) for entry in entries]
+    hass.data[DOMAIN][DATA_GAME_CACHE].set_ttl(timedelta(days=min(ttls, default=DEFAULT_METADATA_INTERVAL)))
@@ -0,0 +1,210 @@
+"""Async client for the RetroAchievements web API."""
+import asyncio
+import contextlib
+import json
+import time
+from datetime import timedelta
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DEFAULT_MAX_CONCURRENCY, DEFAULT_REQUESTS_PER_MINUTE
+from .ratelimit import RequestBudget
+from .stats import ApiStats
+
+BASE_API = "https://retroachievements.org/API"
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=20)
+
+# Query parameters that only identify the caller
+AUTH_PARAMS = ("y", "z")
+
+# Responses that depend on whose key asks, so requests from different accounts never join
+CALLER_SCOPED_ENDPOINTS = frozenset({"API_GetUsersIFollow"})
+
+# Budget queue order: what the user sees change most goes first
+PRIORITY_PRESENCE = 0
+PRIORITY_RECENT_GAMES = 1
+PRIORITY_PROGRESS = 2
+PRIORITY_METADATA = 3
+PRIORITY_FRIENDS = 4
+
+# Responses that are the same for every user, and how long entries may share them
+SHARED_RESPONSE_TTL = {
+    "API_GetAchievementOfTheWeek": timedelta(seconds=60),
+    "API_GetGame": timedelta(seconds=60),
+}
+
+
+class RetroAchievementsApiError(Exception):
+    """Raised when a RetroAchievements API call fails."""
+
+
+class RetroAchievementsTransientError(RetroAchievementsApiError):
+    """Raised for failures worth retrying later (timeouts, connection errors, 5xx)."""
+
+
+class RetroAchievementsRateLimitError(RetroAchievementsTransientError):
+    """Raised when the API answers 429 Too Many Requests."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _retry_after(resp):
+    try:
+        return float(resp.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RetroAchievementsClient:
+    """Talks to the RetroAchievements API over HA's shared aiohttp session.
+
+    One client is shared by every config entry. Identical requests that are
+    already in flight are joined instead of sent again, and responses that do
+    not depend on the user are reused across entries for a short while.
+    Every request that actually goes out first takes a token from the shared
+    RequestBudget, and is timed and counted in ApiStats.
+    """
+
+    def __init__(self, hass: HomeAssistant, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, base_url=BASE_API):
+        self._session = async_get_clientsession(hass)
+        self._base_url = base_url
+        self._inflight = {}
+        self._shared = {}
+        self.budget = RequestBudget(requests_per_minute)
+        self.stats = ApiStats()
+
+    async def async_request(self, endpoint, params, api_key, semaphore=None, priority=PRIORITY_METADATA):
+        # Credentials don't change most responses, so they stay out of the key
+        key = (
+            endpoint,
+            tuple(sorted((k, str(v)) for k, v in params.items() if k not in AUTH_PARAMS)),
+            api_key if endpoint in CALLER_SCOPED_ENDPOINTS else None,
+        )
+
+        shared_ttl = SHARED_RESPONSE_TTL.get(endpoint)
+        if shared_ttl:
+            cached = self._shared.get(key)
+            if cached and time.monotonic() < cached[0]:
+                self.stats.record_cache_hit(endpoint)
+                return cached[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats.record_coalesced(endpoint)
+        else:
+            task = asyncio.ensure_future(self._fetch(endpoint, {**params, "y": api_key}, semaphore, priority))
+            task.add_done_callback(_consume_exception)
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller giving up doesn't cancel the request for the others
+        result = await asyncio.shield(task)
+
+        if shared_ttl:
+            now = time.monotonic()
+            self._shared = {k: v for k, v in self._shared.items() if v[0] > now}
+            self._shared[key] = (now + shared_ttl.total_seconds(), result)
+        return result
+
+    async def _fetch(self, endpoint, params, semaphore, priority):
+        await self.budget.acquire(priority)
+        async with semaphore or contextlib.nullcontext():
+            start = time.monotonic()
+            size = 0
+            try:
+                async with self._session.get(
+                    f"{self._base_url}/{endpoint}.php", params=params, timeout=REQUEST_TIMEOUT
+                ) as resp:
+                    if resp.status == 429:
+                        raise RetroAchievementsRateLimitError(f"{endpoint} rate limited", _retry_after(resp))
+                    if resp.status >= 500:
+                        raise RetroAchievementsTransientError(f"{endpoint} failed: HTTP {resp.status}")
+                    resp.raise_for_status()
+                    body = await resp.read()
+                    size = len(body)
+                    result = json.loads(body)
+            except RetroAchievementsApiError as e:
+                self.stats.record_call(endpoint, time.monotonic() - start, size, str(e))
+                raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self.stats.record_call(endpoint, time.monotonic() - start, size, type(e).__name__)
+                raise RetroAchievementsTransientError(f"{endpoint} failed: {_describe(e)}") from e
+            except (aiohttp.ClientError, ValueError) as e:
+                self.stats.record_call(endpoint, time.monotonic() - start, size, type(e).__name__)
+                raise RetroAchievementsApiError(f"{endpoint} failed: {_describe(e)}") from e
+            self.stats.record_call(endpoint, time.monotonic() - start, size)
+            return result
+
+
+def _describe(e):
+    """Error text without the request URL, which carries the API key."""
+    if isinstance(e, aiohttp.ClientResponseError):
+        return f"HTTP {e.status}"
+    return type(e).__name__
+
+
+def _consume_exception(task):
+    # Mark the error as retrieved even if every waiter was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+class RetroAchievementsAccount:
+    """One user's view of the shared client; fills in the username and API key."""
+
+    def __init__(self, client, username, api_key, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self._client = client
+        self.username = username
+        self.api_key = api_key
+        # Caps how many requests this account has in flight
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _get(self, endpoint, priority, **params):
+        return await self._client.async_request(endpoint, params, self.api_key, self._semaphore, priority)
+
+    async def async_get_user_summary(self, recent_games=1):
+        return await self._get("API_GetUserSummary", PRIORITY_PRESENCE, z=self.username, u=self.username, g=recent_games)
+
+    async def async_get_achievement_of_the_week(self):
+        return await self._get("API_GetAchievementOfTheWeek", PRIORITY_METADATA)
+
+    async def async_get_recently_played_games(self, count=15):
+        return await self._get(
+            "API_GetUserRecentlyPlayedGames", PRIORITY_RECENT_GAMES, z=self.username, u=self.username, c=count
+        )
+
+    async def async_get_console_ids(self):
+        return await self._get("API_GetConsoleIDs", PRIORITY_METADATA)
+
+    async def async_get_game(self, game_id):
+        return await self._get("API_GetGame", PRIORITY_METADATA, i=game_id)
+
+    async def async_get_user_recent_achievements(self, minutes):
+        return await self._get("API_GetUserRecentAchievements", PRIORITY_PROGRESS, u=self.username, m=minutes)
+
+    async def async_get_achievements_earned_between(self, start, end):
+        return await self._get(
+            "API_GetAchievementsEarnedBetween",
+            PRIORITY_METADATA,
+            u=self.username,
+            f=int(start.timestamp()),
+            t=int(end.timestamp()),
+        )
+
+    async def async_get_user_progress(self, game_ids):
+        """Achievement counts for many games in one call, keyed by GameID as a string."""
+        return await self._get(
+            "API_GetUserProgress", PRIORITY_PROGRESS, u=self.username, i=",".join(str(game_id) for game_id in game_ids)
+        )
+
+    async def async_get_users_i_follow(self, offset=0, count=500):
+        return await self._get("API_GetUsersIFollow", PRIORITY_FRIENDS, o=offset, c=count)
+
+    async def async_get_user_profile(self, username):
+        return await self._get("API_GetUserProfile", PRIORITY_FRIENDS, u=username)
+
+    async def async_get_game_info_and_user_progress(self, game_id):
+        return await self._get("API_GetGameInfoAndUserProgress", PRIORITY_PROGRESS, g=game_id, u=self.username)
@@ -0,0 +1,241 @@
+"""Persistent caches for RetroAchievements data."""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .models import safe_int
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+GAME_CACHE_TTL = timedelta(days=7)
+GAME_CACHE_MAX_ENTRIES = 500
+
+CONSOLE_CATALOG_TTL = timedelta(days=30)
+# Don't ask again for a ConsoleID the last catalog didn't have for this long
+CONSOLE_UNKNOWN_RETRY = timedelta(hours=6)
+
+AOTW_LENGTH = timedelta(days=7)
+# How long to keep an AOTW whose StartAt could not be parsed
+AOTW_FALLBACK_TTL = timedelta(hours=1)
+# After the points move, check the AOTW once more this much later, in case
+# the first check got a (shared) response from before the unlock
+AOTW_RECHECK = timedelta(minutes=15)
+
+
+class GameMetadataCache:
+    """LRU cache of API_GetGame responses keyed by GameID.
+
+    Developer, genre, release date and image paths rarely change, so entries
+    live for GAME_CACHE_TTL and survive restarts through a Store.
+    """
+
+    def __init__(self, hass: HomeAssistant, ttl=GAME_CACHE_TTL, max_entries=GAME_CACHE_MAX_ENTRIES):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.game_metadata")
+        self._ttl = ttl.total_seconds()
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def set_ttl(self, ttl):
+        self._ttl = ttl.total_seconds()
+
+    async def async_load(self):
+        stored = await self._store.async_load() or {}
+        # Stored oldest-first, so LRU order survives the round trip. Expiry is
+        # left to get(), since the TTL may still be changed by the options.
+        for game_id, entry in stored.get("games", {}).items():
+            if "fetched" in entry:
+                self._entries[game_id] = entry
+        _LOGGER.debug("Loaded %s cached games", len(self._entries))
+
+    def get(self, game_id):
+        key = str(game_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["fetched"] >= self._ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        # Callers merge into the result, keep the cached copy clean
+        return dict(entry["data"])
+
+    def set(self, game_id, data):
+        key = str(game_id)
+        self._entries[key] = {"fetched": time.time(), "data": data}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_get_or_fetch(self, game_id, fetch):
+        """Return cached metadata for game_id, calling fetch(game_id) on a miss."""
+        cached = self.get(game_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        data = await fetch(game_id)
+        if isinstance(data, dict) and data:
+            self.set(game_id, data)
+            return dict(data)
+        return data
+
+    def _data_to_save(self):
+        return {"games": dict(self._entries)}
+
+
+class ConsoleCatalog:
+    """API_GetConsoleIDs, kept on disk and indexed by ConsoleID and name.
+
+    Lookups never touch the network. async_ensure fetches the catalog only
+    when it is missing, older than CONSOLE_CATALOG_TTL, or lacks a ConsoleID
+    that showed up in a response.
+    """
+
+    def __init__(self, hass: HomeAssistant, ttl=CONSOLE_CATALOG_TTL):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.consoles")
+        self._ttl = ttl.total_seconds()
+        self._by_id = {}
+        self._by_name = {}
+        self._fetched = 0
+        self._lock = asyncio.Lock()
+
+    async def async_load(self):
+        stored = await self._store.async_load() or {}
+        self._index(stored.get("consoles", []), stored.get("fetched", 0))
+        _LOGGER.debug("Loaded %s cached consoles", len(self._by_id))
+
+    def _index(self, consoles, fetched):
+        self._by_id = {
+            safe_int(console.get("ID")): console
+            for console in consoles
+            if isinstance(console, dict) and console.get("ID") is not None
+        }
+        self._by_name = {console.get("Name", "").lower(): console_id for console_id, console in self._by_id.items()}
+        self._fetched = fetched
+
+    def get(self, console_id=None, name=None):
+        console = self._by_id.get(safe_int(console_id))
+        if console is None and name:
+            console = self._by_id.get(self._by_name.get(name.lower()))
+        return console
+
+    def icon(self, console_id=None, name=None):
+        console = self.get(console_id, name)
+        return console.get("IconURL") if console else None
+
+    async def async_ensure(self, console_ids, fetch):
+        """Make sure console_ids can be looked up, calling fetch() only if they can't."""
+        now = time.time()
+        age = now - self._fetched
+        if age < self._ttl and all(safe_int(console_id) in self._by_id for console_id in console_ids):
+            return
+        async with self._lock:
+            # Another caller may have fetched while we waited, and IDs the
+            # catalog still lacks afterwards don't deserve a fetch every poll
+            age = now - self._fetched
+            unknown = [console_id for console_id in console_ids if safe_int(console_id) not in self._by_id]
+            if age < self._ttl and (not unknown or age < CONSOLE_UNKNOWN_RETRY.total_seconds()):
+                return
+            consoles = await fetch()
+            if not isinstance(consoles, list) or not consoles:
+                return
+            self._index(consoles, time.time())
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+            _LOGGER.debug("Fetched %s consoles (unknown IDs: %s)", len(self._by_id), unknown)
+
+    def _data_to_save(self):
+        return {"fetched": self._fetched, "consoles": list(self._by_id.values())}
+
+
+def _find_unlock(unlocks, username, ulid):
+    """Return the unlock entry for a user (case-insensitive name, then ULID)."""
+    if isinstance(unlocks, dict):
+        # sometimes APIs return dicts — convert to list of values
+        unlocks = unlocks.values()
+    elif not isinstance(unlocks, list):
+        return None
+
+    uname_lower = username.lower() if username else None
+    ulid_match = None
+    for entry in unlocks:
+        if not isinstance(entry, dict):
+            continue
+        u_user = entry.get("User")
+        if uname_lower and isinstance(u_user, str) and u_user.lower() == uname_lower:
+            return entry
+        if ulid_match is None and ulid and entry.get("ULID") == ulid:
+            ulid_match = entry
+    return ulid_match
+
+
+class AchievementOfTheWeekCache:
+    """Holds the current Achievement of the Week until its window ends.
+
+    The achievement and its game are fetched once per week. Until the user
+    shows up in the unlocks, the list is only re-checked when their point
+    totals move, plus once more a little later; once they are found nothing
+    is fetched until the next week.
+    """
+
+    def __init__(self, recheck=AOTW_RECHECK):
+        self.recheck = recheck
+        self.aotw = {}
+        self.game = {}
+        self.unlock = None
+        self.end_at = None
+        self._expires = None
+        self._recheck_at = None
+        self._points = None
+
+    @property
+    def game_id(self):
+        return (self.aotw.get("Game") or {}).get("ID")
+
+    def is_stale(self, now, points):
+        if self._expires is None or now >= self._expires:
+            return True
+        if self.unlock is not None:
+            return False
+        if points != self._points:
+            return True
+        return self._recheck_at is not None and now >= self._recheck_at
+
+    def update(self, aotw, game, username, ulid, points, now):
+        # Keep the (potentially large) unlock list out of the cached payload
+        aotw = dict(aotw)
+        unlocks = aotw.pop("Unlocks", None)
+        _LOGGER.debug("AOTW payload keys: %s, unlocks: %s", list(aotw), len(unlocks or ()))
+
+        self.end_at = None
+        start_raw = aotw.get("StartAt")
+        if start_raw:
+            try:
+                self.end_at = datetime.fromisoformat(start_raw.replace("Z", "+00:00")) + AOTW_LENGTH
+            except Exception as e:
+                _LOGGER.debug("Could not parse start_at for AOTW: %s", e)
+        if self.end_at is not None and self.end_at.tzinfo is not None:
+            self._expires = self.end_at
+        else:
+            self._expires = now + AOTW_FALLBACK_TTL
+
+        self.aotw = aotw
+        self.game = game
+        self.unlock = _find_unlock(unlocks, username, ulid)
+        moved = self._points is not None and points != self._points
+        self._recheck_at = now + self.recheck if moved and self.unlock is None else None
+        self._points = points
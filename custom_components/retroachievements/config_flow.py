@@ -1,14 +1,70 @@
 import voluptuous as vol
 from homeassistant import config_entries
-from .const import DOMAIN, CONF_USERNAME, CONF_API_KEY, CONF_NUM_GAMES
+from homeassistant.core import callback
+from .const import (
+    DOMAIN,
+    CONF_USERNAME,
+    CONF_API_KEY,
+    CONF_NUM_GAMES,
+    CONF_MAX_CONCURRENCY,
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_UNLOCK_FEED,
+    CONF_HISTORY,
+    CONF_FRIENDS,
+    CONF_PRESENCE_INTERVAL,
+    CONF_PROGRESS_INTERVAL,
+    CONF_AOTW_INTERVAL,
+    CONF_METADATA_INTERVAL,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_PRESENCE_INTERVAL,
+    DEFAULT_PROGRESS_INTERVAL,
+    DEFAULT_AOTW_INTERVAL,
+    DEFAULT_METADATA_INTERVAL,
+)
+from .coordinator import entry_setting
 
 DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_USERNAME): str,
     vol.Required(CONF_API_KEY): str,
     vol.Optional(CONF_NUM_GAMES, default=3): vol.All(int, vol.Range(min=1, max=15)),
+    vol.Optional(CONF_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY): vol.All(int, vol.Range(min=1, max=10)),
+    vol.Optional(CONF_REQUESTS_PER_MINUTE, default=DEFAULT_REQUESTS_PER_MINUTE): vol.All(int, vol.Range(min=5, max=600)),
+    vol.Optional(CONF_UNLOCK_FEED, default=False): bool,
+    vol.Optional(CONF_HISTORY, default=False): bool,
+    vol.Optional(CONF_FRIENDS, default=False): bool,
 })
 
+
+def options_schema(entry):
+    return vol.Schema({
+        vol.Optional(CONF_NUM_GAMES, default=entry_setting(entry, CONF_NUM_GAMES, 3)): vol.All(int, vol.Range(min=1, max=15)),
+        vol.Optional(CONF_FRIENDS, default=entry_setting(entry, CONF_FRIENDS, False)): bool,
+        # Seconds between summary checks while playing; idle users are checked less often
+        vol.Optional(
+            CONF_PRESENCE_INTERVAL, default=entry_setting(entry, CONF_PRESENCE_INTERVAL, DEFAULT_PRESENCE_INTERVAL)
+        ): vol.All(int, vol.Range(min=10, max=900)),
+        # Minutes before recent games and progress are refetched even if the summary didn't move
+        vol.Optional(
+            CONF_PROGRESS_INTERVAL, default=entry_setting(entry, CONF_PROGRESS_INTERVAL, DEFAULT_PROGRESS_INTERVAL)
+        ): vol.All(int, vol.Range(min=1, max=240)),
+        # Minutes after the points move before the Achievement of the Week unlock is checked a second time
+        vol.Optional(
+            CONF_AOTW_INTERVAL, default=entry_setting(entry, CONF_AOTW_INTERVAL, DEFAULT_AOTW_INTERVAL)
+        ): vol.All(int, vol.Range(min=5, max=1440)),
+        # Days game details are cached for
+        vol.Optional(
+            CONF_METADATA_INTERVAL, default=entry_setting(entry, CONF_METADATA_INTERVAL, DEFAULT_METADATA_INTERVAL)
+        ): vol.All(int, vol.Range(min=1, max=90)),
+    })
+
+
 class RetroAchievementsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return RetroAchievementsOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         if user_input is not None:
             return self.async_create_entry(title="RetroAchievements", data=user_input)
@@ -18,3 +74,14 @@ class RetroAchievementsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=DATA_SCHEMA,
             description_placeholders={"num_games": "Number of Games to Monitor (including Active/Last Played)"}
         )
+
+
+class RetroAchievementsOptionsFlow(config_entries.OptionsFlow):
+    def __init__(self, config_entry):
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(step_id="init", data_schema=options_schema(self._entry))
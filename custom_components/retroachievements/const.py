@@ -1,4 +1,41 @@
+from datetime import timedelta
+
 DOMAIN = "retroachievements"
 CONF_USERNAME = "username"
 CONF_API_KEY = "api_key"
 CONF_NUM_GAMES = "num_games"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_REQUESTS_PER_MINUTE = "requests_per_minute"
+CONF_UNLOCK_FEED = "unlock_feed"
+CONF_HISTORY = "history"
+CONF_FRIENDS = "friends"
+# Options: how often each class of data may be refetched
+CONF_PRESENCE_INTERVAL = "presence_interval"
+CONF_PROGRESS_INTERVAL = "progress_interval"
+CONF_AOTW_INTERVAL = "aotw_interval"
+CONF_METADATA_INTERVAL = "metadata_interval"
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_PRESENCE_INTERVAL = 30  # seconds
+DEFAULT_PROGRESS_INTERVAL = 15  # minutes
+DEFAULT_AOTW_INTERVAL = 15  # minutes
+DEFAULT_METADATA_INTERVAL = 7  # days
+
+DATA_CLIENT = "client"
+DATA_GAME_CACHE = "game_cache"
+DATA_CONSOLE_CATALOG = "console_catalog"
+DATA_IMAGE_CACHE = "image_cache"
+# Entry that carries the integration-wide API sensors
+DATA_API_SENSORS_ENTRY = "api_sensors_entry"
+
+EVENT_ACHIEVEMENT_UNLOCKED = f"{DOMAIN}_achievement_unlocked"
+
+SERVICE_GET_GAME_ACHIEVEMENTS = "get_game_achievements"
+
+IMG_BASE = "https://retroachievements.org"
+# Sensors point at this local view, which serves IMG_BASE images from a disk cache
+IMAGE_PROXY_URL = f"/api/{DOMAIN}/image"
+
+# A user counts as "Online" when their latest game was played this recently
+ONLINE_WINDOW = timedelta(minutes=5)
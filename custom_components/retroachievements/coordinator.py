@@ -0,0 +1,520 @@
+"""Data update coordinator for RetroAchievements."""
+import asyncio
+import logging
+import random
+import sqlite3
+import time
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import (
+    RetroAchievementsAccount,
+    RetroAchievementsApiError,
+    RetroAchievementsRateLimitError,
+    RetroAchievementsTransientError,
+)
+from .cache import STORAGE_VERSION, AchievementOfTheWeekCache
+from .feed import RecentUnlockFeed
+from .friends import RetroAchievementsFriendsCoordinator
+from .game_statistics import GameStatistics
+from .history import AchievementHistory
+from .models import (
+    UNKNOWN_PROGRESS,
+    ProgressRecord,
+    RetroAchievementsSnapshot,
+    badge_from_unlock,
+    completion_percentage,
+    safe_int,
+    unlock_event_data,
+)
+from .const import (
+    CONF_AOTW_INTERVAL,
+    CONF_API_KEY,
+    CONF_FRIENDS,
+    CONF_HISTORY,
+    CONF_MAX_CONCURRENCY,
+    CONF_NUM_GAMES,
+    CONF_PRESENCE_INTERVAL,
+    CONF_PROGRESS_INTERVAL,
+    CONF_UNLOCK_FEED,
+    CONF_USERNAME,
+    DEFAULT_AOTW_INTERVAL,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PRESENCE_INTERVAL,
+    DEFAULT_PROGRESS_INTERVAL,
+    DOMAIN,
+    EVENT_ACHIEVEMENT_UNLOCKED,
+    ONLINE_WINDOW,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+UPDATE_INTERVAL = timedelta(seconds=60)
+
+# Poll faster while the user is playing and step down the longer they are idle.
+# Each row is (idle for at least, poll every); the last matching row wins.
+ACTIVITY_INTERVALS = (
+    (timedelta(0), timedelta(seconds=30)),
+    (ONLINE_WINDOW, UPDATE_INTERVAL),
+    (timedelta(hours=1), timedelta(minutes=5)),
+    (timedelta(days=1), timedelta(minutes=15)),
+)
+
+# Run the full refresh at least this often even when the heartbeat says nothing changed,
+# and never more often than every HEARTBEAT_MIN_POLLS polls at the interval in use
+HEARTBEAT_MAX_STALENESS = timedelta(minutes=DEFAULT_PROGRESS_INTERVAL)
+HEARTBEAT_MIN_POLLS = 4
+
+# The snapshot only matters at the next startup, and Store writes pending saves
+# on shutdown, so it can wait a while instead of rewriting the file every poll
+SNAPSHOT_SAVE_DELAY = 600
+
+BACKOFF_BASE = timedelta(seconds=60)
+BACKOFF_MAX = timedelta(minutes=30)
+
+# Fields from API_GetUserRecentlyPlayedGames that change whenever the user's
+# badges in a game do; if none moved, the last progress fetch still holds.
+# LastPlayed is left out: playing without unlocking anything changes no badge.
+PROGRESS_FINGERPRINT_KEYS = (
+    "NumAchieved",
+    "ScoreAchieved",
+    "NumAchievedHardcore",
+    "ScoreAchievedHardcore",
+)
+
+
+def summary_fingerprint(summary):
+    """The parts of API_GetUserSummary that move whenever anything else would."""
+    recently_played = summary.get("RecentlyPlayed") or [{}]
+    return (
+        summary.get("LastActivity"),
+        summary.get("RichPresenceMsg"),
+        summary.get("TotalPoints"),
+        summary.get("TotalSoftcorePoints"),
+        summary.get("TotalTruePoints"),
+        summary.get("LastGameID"),
+        recently_played[0].get("LastPlayed") if isinstance(recently_played[0], dict) else None,
+    )
+
+
+def activity_interval(last_played, now, fastest=ACTIVITY_INTERVALS[0][1]):
+    """Return the poll interval for a user whose latest game was played at last_played.
+
+    fastest replaces the first row and is a floor for the others.
+    """
+    if last_played is None:
+        return max(ACTIVITY_INTERVALS[-1][1], fastest)
+    idle = now - last_played
+    interval = fastest
+    for min_idle, row_interval in ACTIVITY_INTERVALS[1:]:
+        if idle >= min_idle:
+            interval = max(row_interval, fastest)
+    return interval
+
+
+def snapshot_store(hass: HomeAssistant, entry_id):
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry_id}")
+
+
+def entry_setting(entry: ConfigEntry, key, default=None):
+    """An entry's option, falling back to what was set when it was added."""
+    return entry.options.get(key, entry.data.get(key, default))
+
+
+def backoff_interval(failures, retry_after=None):
+    """Exponential backoff with jitter, never shorter than a server's Retry-After."""
+    delay = min(BACKOFF_MAX.total_seconds(), BACKOFF_BASE.total_seconds() * 2 ** (failures - 1))
+    delay = delay / 2 + random.uniform(0, delay / 2)
+    if retry_after:
+        delay = max(delay, retry_after)
+    return timedelta(seconds=delay)
+
+
+class RetroAchievementsData:
+    def __init__(
+        self,
+        client,
+        username,
+        api_key,
+        num_games,
+        game_cache,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        unlock_feed=None,
+        history=None,
+        console_catalog=None,
+    ):
+        self.account = RetroAchievementsAccount(client, username, api_key, max_concurrency)
+        self.game_cache = game_cache
+        self._username = username
+        self._num_games = num_games
+        self._progress = {}
+        self._aotw = AchievementOfTheWeekCache()
+        self._unlock_feed = unlock_feed
+        self.history = history
+        self.console_catalog = console_catalog
+        self._feed_polled = None
+        self._fingerprint = None
+        self._full_refresh_at = None
+        self._max_staleness = HEARTBEAT_MAX_STALENESS
+        # Set by the coordinator before each update
+        self.poll_interval = UPDATE_INTERVAL
+        self.data = {}
+        # Unlocks the feed saw for the first time during the last update
+        self.new_unlocks = []
+        # The longest rate limit an optional stage of the last update ran into
+        self.rate_limit = None
+        # False when the last update stopped at an unchanged heartbeat
+        self.full_refresh = False
+
+    def set_intervals(self, max_staleness, aotw_recheck):
+        """Longest gap between full refreshes, and between AOTW unlock checks."""
+        self._max_staleness = max_staleness
+        self._aotw.recheck = aotw_recheck
+
+    async def async_update(self):
+        # --- User summary (heartbeat) ---
+        summary = await self.account.async_get_user_summary()
+        self.data["summary"] = summary
+        self.new_unlocks = []
+        self.rate_limit = None
+        self.full_refresh = False
+
+        now = dt_util.utcnow()
+        fingerprint = summary_fingerprint(summary) if isinstance(summary, dict) else None
+        if (
+            fingerprint is not None
+            and fingerprint == self._fingerprint
+            and now - self._full_refresh_at < max(self._max_staleness, HEARTBEAT_MIN_POLLS * self.poll_interval)
+        ):
+            _LOGGER.debug("%s unchanged since the last refresh, skipping the rest", self._username)
+            await self._async_update_history_stats()
+            return
+
+        recent, unlocks = await asyncio.gather(
+            self.account.async_get_recently_played_games(),
+            self._async_poll_unlocks(),
+            return_exceptions=True,
+        )
+
+        # --- Recently played games ---
+        if isinstance(recent, Exception):
+            raise recent
+        if not isinstance(recent, list):
+            _LOGGER.debug("Recent games payload not a list: %s", recent)
+            recent = []
+
+        recent_sorted = sorted(recent, key=lambda g: g.get("LastPlayed", ""), reverse=True)
+        recent_sorted = recent_sorted[:self._num_games]
+
+        await self._async_fill_progress_counts(recent_sorted)
+
+        # None when the feed is off or failed: progress then comes from per-game calls
+        unlocks_by_game = None
+        if isinstance(unlocks, list):
+            unlocks_by_game = {}
+            for unlock in unlocks:
+                unlocks_by_game.setdefault(safe_int(unlock.get("GameID")), []).append(unlock)
+
+        await asyncio.gather(
+            self._async_update_aotw(summary if isinstance(summary, dict) else {}),
+            self._async_sync_history(summary if isinstance(summary, dict) else {}),
+            *(self._async_update_game(game, unlocks_by_game) for game in recent_sorted if game.get("GameID")),
+        )
+
+        console_ids = {game.get("ConsoleID") for game in recent_sorted}
+        console_ids.add((self._aotw.aotw.get("Console") or {}).get("ID"))
+        console_ids.discard(None)
+        await self._async_update_consoles(console_ids)
+
+        # Forget progress for games that dropped out of the tracked list
+        tracked = {game.get("GameID") for game in recent_sorted}
+        for game_id in self._progress.keys() - tracked:
+            del self._progress[game_id]
+
+        self.data["recent_games"] = recent_sorted
+        self.data["active_game"] = recent_sorted[0] if recent_sorted else None
+
+        # --- Achievement of the Week ---
+        self.data["aotw"] = self._aotw.aotw
+        self.data["aotw_game"] = self._aotw.game
+        self.data["aotw_unlock"] = self._aotw.unlock
+        self.data["aotw_end_at"] = self._aotw.end_at
+
+        self.new_unlocks = self._unlock_feed.advance(unlocks, self._feed_polled) if unlocks_by_game is not None else []
+        self._fingerprint = fingerprint
+        self._full_refresh_at = now
+        self.full_refresh = True
+        await self._async_update_history_stats()
+
+    def _stage_failed(self, error, message, *args):
+        """Log a stage the update can do without, but keep a rate limit for the backoff."""
+        if isinstance(error, RetroAchievementsRateLimitError) and (
+            self.rate_limit is None or (error.retry_after or 0) > (self.rate_limit.retry_after or 0)
+        ):
+            self.rate_limit = error
+        _LOGGER.debug(message, *args, error)
+
+    async def _async_fill_progress_counts(self, games):
+        """Fetch counts in one batch for games the recent games payload came without."""
+        missing = [game["GameID"] for game in games if game.get("GameID") and "NumPossibleAchievements" not in game]
+        if not missing:
+            return
+        try:
+            progress = await self.account.async_get_user_progress(missing)
+        except RetroAchievementsApiError as e:
+            self._stage_failed(e, "Failed to fetch progress for %s games: %s", len(missing))
+            return
+        if not isinstance(progress, dict):
+            return
+        for game in games:
+            counts = progress.get(str(game.get("GameID")))
+            if isinstance(counts, dict):
+                game.update(counts)
+
+    async def _async_poll_unlocks(self):
+        """Return unlocks not seen before, or None without a feed."""
+        if self._unlock_feed is None:
+            return None
+        await self._unlock_feed.async_load()
+        self._feed_polled = dt_util.utcnow()
+        try:
+            unlocks = await self.account.async_get_user_recent_achievements(
+                self._unlock_feed.window_minutes(self._feed_polled)
+            )
+        except RetroAchievementsApiError as e:
+            self._stage_failed(e, "Failed to fetch recent unlocks: %s")
+            return None
+        if not isinstance(unlocks, list):
+            return None
+        return self._unlock_feed.new_unlocks(unlocks)
+
+    async def _async_update_consoles(self, console_ids):
+        if self.console_catalog is None:
+            return
+        try:
+            await self.console_catalog.async_ensure(console_ids, self.account.async_get_console_ids)
+        except RetroAchievementsApiError as e:
+            self._stage_failed(e, "Failed to fetch the console catalog: %s")
+
+    async def _async_sync_history(self, summary):
+        if self.history is None:
+            return
+        try:
+            await self.history.async_sync(self.account, summary)
+        except RetroAchievementsApiError as e:
+            self._stage_failed(e, "Failed to sync unlock history: %s")
+        except sqlite3.Error as e:
+            _LOGGER.warning("Could not update the unlock history database: %s", e)
+
+    async def _async_update_history_stats(self):
+        # Recomputed on every refresh so "today" rolls over without new unlocks
+        if self.history is None:
+            return
+        try:
+            self.data["history"] = await self.history.async_stats()
+        except sqlite3.Error as e:
+            _LOGGER.warning("Could not read the unlock history database: %s", e)
+
+    async def _async_update_aotw(self, summary):
+        """Re-fetch the AOTW only for a new week or when the user may have unlocked it."""
+        now = dt_util.utcnow()
+        points = (summary.get("TotalPoints"), summary.get("TotalSoftcorePoints"))
+        if not self._aotw.is_stale(now, points):
+            return
+
+        try:
+            aotw = await self.account.async_get_achievement_of_the_week()
+        except RetroAchievementsApiError as e:
+            self._stage_failed(e, "Failed to fetch AOTW: %s")
+            return
+        if not isinstance(aotw, dict):
+            aotw = {}
+
+        game_id = (aotw.get("Game") or {}).get("ID")
+        if game_id and game_id == self._aotw.game_id:
+            game = self._aotw.game
+        else:
+            game = await self._async_get_aotw_game(game_id)
+        self._aotw.update(aotw, game, self._username, summary.get("ULID"), points, now)
+
+    async def _async_get_aotw_game(self, game_id):
+        """Fetch full game info for the AOTW game (box art and icon)."""
+        if not game_id:
+            return {}
+        try:
+            full_game = await self.game_cache.async_get_or_fetch(game_id, self.account.async_get_game)
+        except RetroAchievementsApiError as e:
+            self._stage_failed(e, "Could not fetch full game info for AOTW box art: %s")
+            return {}
+        return full_game if isinstance(full_game, dict) else {}
+
+    async def _async_update_game(self, game, unlocks_by_game=None):
+        """Merge full game info and user progress into a recent game entry."""
+        game_id = game["GameID"]
+        full_game, progress = await asyncio.gather(
+            self.game_cache.async_get_or_fetch(game_id, self.account.async_get_game),
+            self._async_get_progress(game, unlocks_by_game),
+            return_exceptions=True,
+        )
+
+        if isinstance(full_game, Exception):
+            self._stage_failed(full_game, "Failed to fetch full game info for %s: %s", game.get("Title"))
+        elif isinstance(full_game, dict):
+            for key in ["GameIcon", "ImageBoxArt", "ImageTitle", "ImageIngame"]:
+                if key in game and key not in full_game:
+                    full_game[key] = game[key]
+            game.update(full_game)
+
+        if isinstance(progress, Exception):
+            self._stage_failed(progress, "Failed to fetch badges or completion for %s: %s", game.get("Title"))
+            progress = UNKNOWN_PROGRESS
+        game.update(progress.attributes)
+
+    async def _async_get_progress(self, game, unlocks_by_game=None):
+        """Return badges and completion for a game, re-fetching only when its progress changed.
+
+        With the unlock feed, a game fetched once is afterwards kept current from
+        the feed and the recent games counts alone.
+        """
+        game_id = game["GameID"]
+        fingerprint = tuple(game.get(key) for key in PROGRESS_FINGERPRINT_KEYS)
+        cached = self._progress.get(game_id)
+        unlocks = unlocks_by_game.get(game_id) if unlocks_by_game is not None else None
+        if cached and cached[0] == fingerprint and not unlocks:
+            return cached[1]
+
+        if cached and unlocks_by_game is not None:
+            possible = game.get("NumPossibleAchievements")
+            progress = cached[1].merged(
+                [badge_from_unlock(unlock) for unlock in unlocks or () if unlock.get("BadgeName")],
+                completion_percentage(game.get("NumAchieved"), possible) or cached[1].completion,
+                completion_percentage(game.get("NumAchievedHardcore"), possible) or cached[1].completion_hardcore,
+            )
+            self._progress[game_id] = (fingerprint, progress)
+            return progress
+
+        badge_data = await self.account.async_get_game_info_and_user_progress(game_id)
+        progress = ProgressRecord.from_api(badge_data)
+        self._progress[game_id] = (fingerprint, progress)
+        return progress
+
+
+class RetroAchievementsCoordinator(DataUpdateCoordinator):
+    """Refreshes one account once per interval and pushes the result to every sensor.
+
+    The last good refresh is persisted, so after a restart entities start from
+    it right away and are only marked stale until the first refresh lands. A
+    failed refresh keeps the previous data, also marked stale.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, client, game_cache, console_catalog=None):
+        self.client = client
+        self._store = snapshot_store(hass, entry.entry_id)
+        self._restored = False
+        self.last_success_at = None
+        self.username = entry.data[CONF_USERNAME]
+        self.num_games = entry_setting(entry, CONF_NUM_GAMES, 5)
+        self.ra_data = RetroAchievementsData(
+            client,
+            self.username,
+            entry.data[CONF_API_KEY],
+            self.num_games,
+            game_cache,
+            entry.data.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+            RecentUnlockFeed(hass, entry.entry_id) if entry.data.get(CONF_UNLOCK_FEED) else None,
+            AchievementHistory(hass, entry.entry_id) if entry.data.get(CONF_HISTORY) else None,
+            console_catalog,
+        )
+        self._game_statistics = GameStatistics(hass, self.username)
+        # Followed users run on their own, slower schedule
+        self.friends = RetroAchievementsFriendsCoordinator(hass, entry, client) if entry_setting(entry, CONF_FRIENDS) else None
+        self._failures = 0
+        self.last_refresh_duration = None
+        self._presence_interval = timedelta(seconds=DEFAULT_PRESENCE_INTERVAL)
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} {self.username}",
+            update_interval=UPDATE_INTERVAL,
+        )
+        self.apply_options(entry)
+
+    def apply_options(self, entry: ConfigEntry):
+        """Take the refresh intervals from the entry's options, no reload needed."""
+        self._presence_interval = timedelta(
+            seconds=entry_setting(entry, CONF_PRESENCE_INTERVAL, DEFAULT_PRESENCE_INTERVAL)
+        )
+        self.ra_data.set_intervals(
+            timedelta(minutes=entry_setting(entry, CONF_PROGRESS_INTERVAL, DEFAULT_PROGRESS_INTERVAL)),
+            timedelta(minutes=entry_setting(entry, CONF_AOTW_INTERVAL, DEFAULT_AOTW_INTERVAL)),
+        )
+
+    @property
+    def stale(self):
+        """True while showing restored data or data from before a failed refresh."""
+        return self.data is not None and (self._restored or not self.last_update_success)
+
+    async def async_restore(self):
+        """Load the snapshot saved by the last successful refresh, if any."""
+        stored = await self._store.async_load()
+        if not stored or not isinstance(stored.get("data"), dict):
+            return
+        data = stored["data"]
+        if data.get("aotw_end_at"):
+            data["aotw_end_at"] = dt_util.parse_datetime(data["aotw_end_at"])
+        self.ra_data.data = data
+        self.last_success_at = dt_util.parse_datetime(stored["saved_at"]) if stored.get("saved_at") else None
+        self.data = RetroAchievementsSnapshot(data, self.ra_data.console_catalog)
+        self._restored = True
+        _LOGGER.debug("Restored %s snapshot from %s", self.username, self.last_success_at)
+
+    def _data_to_save(self):
+        return {"saved_at": self.last_success_at.isoformat(), "data": self.ra_data.data}
+
+    async def async_close(self):
+        if self.ra_data.history is not None:
+            await self.ra_data.history.async_close()
+
+    async def _async_update_data(self):
+        start = time.monotonic()
+        self.ra_data.poll_interval = self.update_interval
+        try:
+            await self.ra_data.async_update()
+        except RetroAchievementsTransientError as e:
+            self._failures += 1
+            retry_after = e.retry_after if isinstance(e, RetroAchievementsRateLimitError) else None
+            self.update_interval = backoff_interval(self._failures, retry_after)
+            raise UpdateFailed(
+                f"Error updating RetroAchievements data, retrying in {self.update_interval}: {e}"
+            ) from e
+        except RetroAchievementsApiError as e:
+            raise UpdateFailed(f"Error updating RetroAchievements data: {e}") from e
+        finally:
+            self.last_refresh_duration = time.monotonic() - start
+
+        rate_limit = self.ra_data.rate_limit
+        self._failures = self._failures + 1 if rate_limit else 0
+        self._restored = False
+        self.last_success_at = dt_util.utcnow()
+        if self.ra_data.full_refresh:
+            self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+        for unlock in self.ra_data.new_unlocks:
+            self.hass.bus.async_fire(EVENT_ACHIEVEMENT_UNLOCKED, unlock_event_data(self.username, unlock))
+
+        # Parsed once here; every entity renders from the same records
+        snapshot = RetroAchievementsSnapshot(self.ra_data.data, self.ra_data.console_catalog)
+        self._game_statistics.async_record(snapshot.games)
+        active_game = snapshot.active_game
+        self.update_interval = activity_interval(
+            active_game.last_played if active_game else None, dt_util.utcnow(), self._presence_interval
+        )
+        if rate_limit:
+            # The refresh got through, but part of it was rate limited: slow down all the same
+            self.update_interval = max(self.update_interval, backoff_interval(self._failures, rate_limit.retry_after))
+            _LOGGER.debug("Rate limited during refresh, next one in %s", self.update_interval)
+        return snapshot
@@ -0,0 +1,48 @@
+"""Diagnostics support for RetroAchievements."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY, CONF_USERNAME, DATA_GAME_CACHE, DATA_IMAGE_CACHE, DOMAIN
+
+TO_REDACT = {CONF_API_KEY, CONF_USERNAME}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    client = coordinator.client
+    game_cache = hass.data[DOMAIN][DATA_GAME_CACHE]
+    image_cache = hass.data[DOMAIN][DATA_IMAGE_CACHE]
+    snapshot = coordinator.data
+    duration = coordinator.last_refresh_duration
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "options": dict(entry.options),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "last_exception": repr(coordinator.last_exception) if coordinator.last_exception else None,
+            "update_interval": str(coordinator.update_interval),
+            "last_refresh_ms": round(duration * 1000) if duration is not None else None,
+            "tracked_games": len(snapshot.games) if snapshot else 0,
+        },
+        "budget": {
+            "requests_per_minute": client.budget.requests_per_minute,
+            "remaining": client.budget.remaining,
+            "queued": client.budget.queued,
+        },
+        "game_cache": {
+            "entries": len(game_cache),
+            "hits": game_cache.hits,
+            "misses": game_cache.misses,
+        },
+        "image_cache": {
+            "entries": len(image_cache),
+            "bytes": image_cache.total_bytes,
+        },
+        "friends": {
+            "following": len(coordinator.friends.data or {}),
+            "last_update_success": coordinator.friends.last_update_success,
+        } if coordinator.friends is not None else None,
+        "endpoints": client.stats.as_dict(),
+    }
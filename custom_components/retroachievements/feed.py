@@ -0,0 +1,99 @@
+"""Incremental feed of a user's unlocks (API_GetUserRecentAchievements)."""
+import logging
+import math
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .cache import SAVE_DELAY, STORAGE_VERSION
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Overlap between polls so an unlock recorded late server-side isn't missed;
+# anything already seen is dropped by the high-water mark.
+FEED_WINDOW_MARGIN = timedelta(minutes=5)
+# After a long downtime, only look this far back
+FEED_MAX_WINDOW = timedelta(days=1)
+
+
+def _unlock_key(unlock):
+    return f"{unlock.get('AchievementID')}:{unlock.get('HardcoreMode')}"
+
+
+class RecentUnlockFeed:
+    """Tracks which unlocks have been seen, across restarts.
+
+    The high-water mark is the newest unlock Date seen, plus the unlocks at
+    exactly that second (Date has no sub-second part). The first poll only
+    sets the mark, so existing unlocks don't fire as new.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.unlocks.{entry_id}")
+        self._loaded = False
+        self._high_water = None
+        self._seen = set()
+        self._polled = None
+
+    async def async_remove(self):
+        await self._store.async_remove()
+
+    async def async_load(self):
+        if self._loaded:
+            return
+        stored = await self._store.async_load() or {}
+        self._high_water = stored.get("high_water")
+        self._seen = set(stored.get("seen", ()))
+        polled = stored.get("polled")
+        self._polled = dt_util.parse_datetime(polled) if polled else None
+        self._loaded = True
+
+    def window_minutes(self, now):
+        """Minutes to ask for: since the last poll, with some overlap."""
+        since = now - self._polled if self._polled else FEED_MAX_WINDOW
+        window = min(since + FEED_WINDOW_MARGIN, FEED_MAX_WINDOW)
+        return max(1, math.ceil(window.total_seconds() / 60))
+
+    def new_unlocks(self, unlocks):
+        """Return unlocks newer than the high-water mark, oldest first."""
+        unlocks = sorted(
+            (unlock for unlock in unlocks if isinstance(unlock, dict) and unlock.get("Date")),
+            key=lambda unlock: unlock["Date"],
+        )
+        return [
+            unlock for unlock in unlocks
+            if self._high_water is None
+            or unlock["Date"] > self._high_water
+            or (unlock["Date"] == self._high_water and _unlock_key(unlock) not in self._seen)
+        ]
+
+    def advance(self, new, now):
+        """Mark new (from new_unlocks) as seen; returns the ones to announce.
+
+        Called only once the refresh they came with succeeded, so a failed
+        refresh doesn't swallow their events.
+        """
+        first_poll = self._polled is None and self._high_water is None
+        if new:
+            newest = new[-1]["Date"]
+            if newest != self._high_water:
+                self._high_water = newest
+                self._seen = set()
+            self._seen.update(_unlock_key(unlock) for unlock in new if unlock["Date"] == newest)
+        self._polled = now
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+        if first_poll:
+            _LOGGER.debug("Unlock feed primed with %s existing unlocks", len(new))
+            return []
+        return new
+
+    def _data_to_save(self):
+        return {
+            "high_water": self._high_water,
+            "seen": sorted(self._seen),
+            "polled": self._polled.isoformat() if self._polled else None,
+        }
@@ -0,0 +1,127 @@
+"""Users the account follows, refreshed in small batches on their own schedule."""
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import RetroAchievementsAccount, RetroAchievementsApiError
+from .const import CONF_API_KEY, CONF_USERNAME, DOMAIN
+from .models import safe_int
+
+_LOGGER = logging.getLogger(__name__)
+
+FRIENDS_INTERVAL = timedelta(minutes=5)
+# Profiles fetched per cycle, on top of one follow list call per FOLLOWS_PAGE_SIZE users
+FRIENDS_BATCH_SIZE = 5
+FRIENDS_MAX_CONCURRENCY = 2
+FOLLOWS_PAGE_SIZE = 500
+
+
+class FollowedUsers:
+    """Points for every followed user from API_GetUsersIFollow, profiles for a few per cycle.
+
+    The follow list already carries everyone's points, so a cycle costs the
+    list plus at most batch_size API_GetUserProfile calls: users never fetched
+    first, then users whose points moved, then the longest unrefreshed.
+    """
+
+    def __init__(self, account, batch_size=FRIENDS_BATCH_SIZE):
+        self._account = account
+        self._batch_size = batch_size
+        self.friends = {}
+
+    async def async_update(self):
+        friends = {}
+        for follow in await self._async_get_follows():
+            user = follow.get("User") if isinstance(follow, dict) else None
+            if not user:
+                continue
+            friends[user] = {
+                **self.friends.get(user, {}),
+                "user": user,
+                "points": safe_int(follow.get("Points")),
+                "softcore_points": safe_int(follow.get("PointsSoftcore")),
+                "following_me": bool(follow.get("IsFollowingMe")),
+            }
+        self.friends = friends
+
+        due = self._due()
+        profiles = await asyncio.gather(
+            *(self._account.async_get_user_profile(user) for user in due), return_exceptions=True
+        )
+        now = time.monotonic()
+        for user, profile in zip(due, profiles):
+            if isinstance(profile, Exception):
+                _LOGGER.debug("Failed to fetch the profile of %s: %s", user, profile)
+                continue
+            if not isinstance(profile, dict):
+                continue
+            friend = friends[user]
+            friend.update({
+                "true_points": safe_int(profile.get("TotalTruePoints")),
+                "rich_presence": profile.get("RichPresenceMsg"),
+                "last_game_id": profile.get("LastGameID"),
+                "motto": profile.get("Motto"),
+                "user_pic": profile.get("UserPic"),
+                "profile_points": friend["points"],
+                "profile_fetched": now,
+            })
+        _LOGGER.debug("Following %s users, refreshed %s profiles", len(friends), len(due))
+
+    async def _async_get_follows(self):
+        follows = []
+        while True:
+            page = await self._account.async_get_users_i_follow(len(follows), FOLLOWS_PAGE_SIZE)
+            results = page.get("Results") if isinstance(page, dict) else None
+            if not results:
+                return follows
+            follows.extend(results)
+            if len(follows) >= safe_int(page.get("Total")):
+                return follows
+
+    def _due(self):
+        def order(friend):
+            if "profile_fetched" not in friend:
+                return (0, 0)
+            if friend["points"] != friend["profile_points"]:
+                return (1, friend["profile_fetched"])
+            return (2, friend["profile_fetched"])
+
+        due = sorted(self.friends.values(), key=order)[:self._batch_size]
+        return [friend["user"] for friend in due]
+
+
+class RetroAchievementsFriendsCoordinator(DataUpdateCoordinator):
+    """Refreshes the followed users of one account, separately from the account itself."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, client):
+        self.client = client
+        self.username = entry.data[CONF_USERNAME]
+        self.last_success_at = None
+        # Its own account so friend lookups never hold the main refresh's request slots
+        self.followed = FollowedUsers(
+            RetroAchievementsAccount(client, self.username, entry.data[CONF_API_KEY], FRIENDS_MAX_CONCURRENCY)
+        )
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} {self.username} friends",
+            update_interval=FRIENDS_INTERVAL,
+        )
+
+    @property
+    def stale(self):
+        return self.data is not None and not self.last_update_success
+
+    async def _async_update_data(self):
+        try:
+            await self.followed.async_update()
+        except RetroAchievementsApiError as e:
+            raise UpdateFailed(f"Error updating followed RetroAchievements users: {e}") from e
+        self.last_success_at = dt_util.utcnow()
+        return dict(self.followed.friends)
@@ -0,0 +1,71 @@
+"""Per-game progress written to the recorder as long-term statistics."""
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# (GameRecord attribute, statistic suffix, unit)
+GAME_STATISTICS = (
+    ("score_achieved", "score", "points"),
+    ("achievements_unlocked", "achievements", "achievements"),
+)
+
+
+class GameStatistics:
+    """Imports each tracked game's score and unlock count as external statistics.
+
+    Games come and go from the recent list, so instead of one entity per
+    game the values go straight into the statistics tables, keyed
+    retroachievements:<user>_game_<id>_<score|achievements>. Both are
+    cumulative, so they are written as sums: a row for the current hour
+    only when a value moved, and graphs can show points earned per period.
+    """
+
+    def __init__(self, hass: HomeAssistant, username):
+        self._hass = hass
+        self._username = username
+        self._prefix = f"{DOMAIN}:{slugify(username)}_game"
+        self._written = {}
+
+    @callback
+    def async_record(self, games):
+        if "recorder" not in self._hass.config.components:
+            return
+        # The recorder is optional, only import it once it is running
+        from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+        try:
+            from homeassistant.components.recorder.models import StatisticMeanType
+        except ImportError:
+            # Releases before mean_type and unit_class existed
+            StatisticMeanType = None
+
+        hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        for game in games:
+            if not game.game_id:
+                continue
+            for attribute, suffix, unit in GAME_STATISTICS:
+                statistic_id = f"{self._prefix}_{game.game_id}_{suffix}"
+                value = game.attributes[attribute]
+                if self._written.get(statistic_id) == value:
+                    continue
+                self._written[statistic_id] = value
+                metadata = StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"{self._username} {game.title} {suffix}",
+                    source=DOMAIN,
+                    statistic_id=statistic_id,
+                    unit_of_measurement=unit,
+                )
+                if StatisticMeanType is not None:
+                    metadata["mean_type"] = StatisticMeanType.NONE
+                    metadata["unit_class"] = None
+                async_add_external_statistics(
+                    self._hass, metadata, [StatisticData(start=hour, state=value, sum=value)]
+                )
+                _LOGGER.debug("Recorded %s = %s", statistic_id, value)
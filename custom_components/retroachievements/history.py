@@ -0,0 +1,220 @@
+"""Local SQLite index of a user's unlock history."""
+import asyncio
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .api import RetroAchievementsApiError, RetroAchievementsRateLimitError
+from .const import DOMAIN
+from .models import parse_last_played, safe_int
+
+_LOGGER = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Backfill walks back from the first sync in windows this long, a few per refresh
+HISTORY_CHUNK = timedelta(days=30)
+HISTORY_CHUNKS_PER_REFRESH = 2
+# Overlap with the newest stored unlock when extending forward
+HISTORY_MARGIN = timedelta(minutes=5)
+# Lower bound when the profile has no MemberSince
+HISTORY_EPOCH = datetime(2012, 1, 1, tzinfo=timezone.utc)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS unlocks (
+        achievement_id INTEGER NOT NULL,
+        hardcore INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        points INTEGER NOT NULL DEFAULT 0,
+        title TEXT,
+        game_id INTEGER,
+        game_title TEXT,
+        console TEXT,
+        PRIMARY KEY (achievement_id, hardcore)
+    )""",
+    "CREATE INDEX IF NOT EXISTS unlocks_date ON unlocks (date)",
+    "CREATE INDEX IF NOT EXISTS unlocks_console ON unlocks (console, achievement_id)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+
+def _format(dt):
+    return dt.astimezone(timezone.utc).strftime(DATE_FORMAT)
+
+
+def _row(unlock):
+    return (
+        safe_int(unlock.get("AchievementID")),
+        1 if safe_int(unlock.get("HardcoreMode")) else 0,
+        unlock["Date"],
+        safe_int(unlock.get("Points")),
+        unlock.get("Title"),
+        safe_int(unlock.get("GameID")),
+        unlock.get("GameTitle"),
+        unlock.get("ConsoleName"),
+    )
+
+
+def _remove_files(path):
+    for file in (path, f"{path}-journal"):
+        try:
+            os.remove(file)
+        except FileNotFoundError:
+            pass
+
+
+def _streaks(days, today):
+    """Current and longest run of consecutive days in days (sorted date objects)."""
+    longest = current = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    # A streak is still alive until a whole day passes without an unlock
+    if previous is None or today - previous > timedelta(days=1):
+        current = 0
+    return current, longest
+
+
+class AchievementHistory:
+    """Unlock history for one account, kept in a SQLite file.
+
+    The first sync marks "now"; later syncs extend forward from the newest
+    stored unlock, while HISTORY_CHUNKS_PER_REFRESH windows per refresh are
+    backfilled from API_GetAchievementsEarnedBetween until MemberSince.
+    All queries run in the executor, one at a time.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id):
+        self._hass = hass
+        self._path = hass.config.path(".cache", DOMAIN, f"history.{entry_id}.db")
+        self._conn = None
+        self._lock = asyncio.Lock()
+        self._points = None
+
+    async def _async_run(self, func, *args):
+        async with self._lock:
+            if self._conn is None:
+                self._conn = await self._hass.async_add_executor_job(self._open)
+            return await self._hass.async_add_executor_job(func, *args)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        conn = sqlite3.connect(self._path, check_same_thread=False)
+        with conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+        return conn
+
+    async def async_close(self):
+        async with self._lock:
+            if self._conn is not None:
+                await self._hass.async_add_executor_job(self._conn.close)
+                self._conn = None
+
+    async def async_remove(self):
+        """Delete the database, for an entry that is being removed."""
+        await self.async_close()
+        await self._hass.async_add_executor_job(_remove_files, self._path)
+
+    # --- sync ---
+
+    async def async_sync(self, account, summary):
+        """Pull unlocks newer than the index, then backfill a little further back."""
+        now = dt_util.utcnow()
+        meta = await self._async_run(self._get_meta)
+        if "newest" not in meta:
+            await self._async_run(self._set_meta, {"newest": _format(now), "backfilled_to": _format(now)})
+            meta = await self._async_run(self._get_meta)
+
+        # Points don't move without an unlock, so the forward call can wait for them to
+        points = (summary.get("TotalPoints"), summary.get("TotalSoftcorePoints"))
+        if points != self._points:
+            newest = datetime.strptime(meta["newest"], DATE_FORMAT).replace(tzinfo=timezone.utc)
+            unlocks = await account.async_get_achievements_earned_between(newest - HISTORY_MARGIN, now)
+            await self._async_run(self._store, unlocks, {"newest": _format(max(newest, now - HISTORY_MARGIN))})
+            self._points = points
+
+        member_since = parse_last_played(summary.get("MemberSince")) or HISTORY_EPOCH
+        backfilled_to = datetime.strptime(meta["backfilled_to"], DATE_FORMAT).replace(tzinfo=timezone.utc)
+        for _ in range(HISTORY_CHUNKS_PER_REFRESH):
+            if backfilled_to <= member_since:
+                break
+            start = max(member_since, backfilled_to - HISTORY_CHUNK)
+            try:
+                unlocks = await account.async_get_achievements_earned_between(start, backfilled_to)
+            except RetroAchievementsRateLimitError:
+                # Let the coordinator back off
+                raise
+            except RetroAchievementsApiError as e:
+                _LOGGER.debug("History backfill before %s failed: %s", backfilled_to, e)
+                break
+            await self._async_run(self._store, unlocks, {"backfilled_to": _format(start)})
+            backfilled_to = start
+            _LOGGER.debug("History backfilled to %s", backfilled_to)
+
+    def _get_meta(self):
+        return dict(self._conn.execute("SELECT key, value FROM meta"))
+
+    def _set_meta(self, meta):
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items())
+
+    def _store(self, unlocks, meta):
+        rows = [_row(unlock) for unlock in unlocks or () if isinstance(unlock, dict) and unlock.get("Date")]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO unlocks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items())
+
+    # --- statistics ---
+
+    async def async_stats(self):
+        now = dt_util.now()
+        today = dt_util.start_of_local_day(now)
+        week = today - timedelta(days=today.weekday())
+        offset = int(now.utcoffset().total_seconds())
+        return await self._async_run(self._stats, _format(today), _format(week), offset, today.date())
+
+    def _stats(self, today, week, offset, today_date):
+        conn = self._conn
+        # An achievement unlocked in softcore and later in hardcore counts once
+        points_since = """
+            SELECT COALESCE(SUM(points), 0), COUNT(*) FROM (
+                SELECT MAX(points) AS points FROM unlocks WHERE date >= ? GROUP BY achievement_id
+            )"""
+        points_today, unlocks_today = conn.execute(points_since, (today,)).fetchone()
+        points_week, unlocks_week = conn.execute(points_since, (week,)).fetchone()
+
+        days = [
+            datetime.strptime(day, "%Y-%m-%d").date()
+            for (day,) in conn.execute(
+                "SELECT DISTINCT date(date, ?) AS day FROM unlocks ORDER BY day", (f"{offset} seconds",)
+            )
+        ]
+        current_streak, longest_streak = _streaks(days, today_date)
+
+        consoles = {
+            console or "Unknown": {"achievements": achievements, "points": points}
+            for console, achievements, points in conn.execute(
+                """SELECT console, COUNT(*), SUM(points) FROM (
+                       SELECT console, MAX(points) AS points FROM unlocks GROUP BY achievement_id
+                   ) GROUP BY console ORDER BY COUNT(*) DESC"""
+            )
+        }
+        meta = self._get_meta()
+        return {
+            "points_today": points_today,
+            "unlocks_today": unlocks_today,
+            "points_week": points_week,
+            "unlocks_week": unlocks_week,
+            "current_streak": current_streak,
+            "longest_streak": longest_streak,
+            "last_unlock_day": days[-1].isoformat() if days else None,
+            "consoles": consoles,
+            "total_unlocks": sum(console["achievements"] for console in consoles.values()),
+            "backfilled_to": meta.get("backfilled_to"),
+        }
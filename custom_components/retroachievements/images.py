@@ -0,0 +1,193 @@
+"""Local proxy and disk cache for RetroAchievements images."""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from datetime import timedelta
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+
+from .cache import SAVE_DELAY, STORAGE_VERSION
+from .const import DOMAIN, IMAGE_PROXY_URL, IMG_BASE
+from .models import IMAGE_PATH_RE, is_published_image
+
+_LOGGER = logging.getLogger(__name__)
+
+IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+IMAGE_MAX_BYTES = 2 * 1024 * 1024
+IMAGE_TIMEOUT = aiohttp.ClientTimeout(total=20)
+
+# Game images and badges never change under the same name; profile pictures do
+MUTABLE_PREFIXES = ("/UserPic/",)
+MUTABLE_TTL = timedelta(days=1)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MUTABLE_CACHE_CONTROL = f"public, max-age={int(MUTABLE_TTL.total_seconds())}"
+
+
+def _is_mutable(path):
+    return path.startswith(MUTABLE_PREFIXES)
+
+
+def _write_file(file, content):
+    if file.exists():
+        return
+    file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = file.with_suffix(f"{file.suffix}.tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, file)
+
+
+def _remove_file(file):
+    try:
+        file.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _existing_files(directory):
+    if not directory.is_dir():
+        return set()
+    return {file.name for file in directory.iterdir()}
+
+
+class ImageCache:
+    """Size-limited LRU cache of images from IMG_BASE, stored on disk.
+
+    Files are named after the SHA-256 of their content, so the same image
+    under several paths is stored once. The path index lives in a Store and
+    keeps LRU order across restarts.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self._hass = hass
+        self._session = async_get_clientsession(hass)
+        self._dir = Path(hass.config.path(".cache", DOMAIN, "images"))
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.images")
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._refs = Counter()
+        self._sizes = {}
+        self._inflight = {}
+        self.total_bytes = 0
+
+    async def async_load(self):
+        stored = await self._store.async_load() or {}
+        files = await self._hass.async_add_executor_job(_existing_files, self._dir)
+        for path, entry in stored.get("images", {}).items():
+            if entry["file"] in files:
+                self._add(path, entry)
+        _LOGGER.debug("Loaded %s cached images (%s bytes)", len(self._entries), self.total_bytes)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    def file_path(self, entry):
+        return self._dir / entry["file"]
+
+    async def async_get(self, path):
+        """Return the cache entry for path, downloading it on a miss."""
+        entry = self._entries.get(path)
+        expired = entry is not None and _is_mutable(path) and time.time() - entry["fetched"] >= MUTABLE_TTL.total_seconds()
+        if entry is not None and not expired:
+            self._entries.move_to_end(path)
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+            return entry
+
+        task = self._inflight.get(path)
+        if task is None:
+            task = self._inflight[path] = asyncio.ensure_future(self._async_fetch(path))
+            task.add_done_callback(lambda _: self._inflight.pop(path, None))
+        fetched = await asyncio.shield(task)
+        # Serve a stale profile picture rather than nothing
+        return fetched or entry
+
+    async def _async_fetch(self, path):
+        try:
+            async with self._session.get(f"{IMG_BASE}{path}", timeout=IMAGE_TIMEOUT) as resp:
+                if resp.status != 200:
+                    _LOGGER.debug("Image %s returned HTTP %s", path, resp.status)
+                    return None
+                content = await resp.content.read(IMAGE_MAX_BYTES + 1)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _LOGGER.debug("Failed to fetch image %s: %s", path, e)
+            return None
+        if len(content) > IMAGE_MAX_BYTES:
+            _LOGGER.debug("Image %s is larger than %s bytes, not caching", path, IMAGE_MAX_BYTES)
+            return None
+
+        entry = {
+            "file": hashlib.sha256(content).hexdigest() + Path(path).suffix.lower(),
+            "size": len(content),
+            "fetched": time.time(),
+        }
+        await self._hass.async_add_executor_job(_write_file, self.file_path(entry), content)
+        old = self._entries.pop(path, None)
+        self._add(path, entry)
+        if old is not None:
+            self._release(old)
+        self._evict()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return entry
+
+    def _add(self, path, entry):
+        self._entries[path] = entry
+        name = entry["file"]
+        if name not in self._sizes:
+            self._sizes[name] = entry["size"]
+            self.total_bytes += entry["size"]
+        self._refs[name] += 1
+
+    def _release(self, entry):
+        name = entry["file"]
+        self._refs[name] -= 1
+        if self._refs[name] <= 0:
+            del self._refs[name]
+            self.total_bytes -= self._sizes.pop(name)
+            self._hass.async_add_executor_job(_remove_file, self.file_path(entry))
+
+    def _evict(self):
+        while self.total_bytes > self._max_bytes and len(self._entries) > 1:
+            self._release(self._entries.popitem(last=False)[1])
+
+    def _data_to_save(self):
+        return {"images": dict(self._entries)}
+
+
+class RetroAchievementsImageView(HomeAssistantView):
+    """Serves IMG_BASE images from the local cache.
+
+    No auth: the images are public and <img> tags can't send a token. Only
+    paths the integration published in a sensor, or already has on disk, are
+    served, so the view can't be used to fill the cache with anything else.
+    """
+
+    url = f"{IMAGE_PROXY_URL}/{{path:.+}}"
+    name = "api:retroachievements:image"
+    requires_auth = False
+
+    def __init__(self, image_cache):
+        self._cache = image_cache
+
+    async def get(self, request, path):
+        path = f"/{path}"
+        if not IMAGE_PATH_RE.match(path) or not (is_published_image(path) or path in self._cache):
+            return web.Response(status=404)
+
+        entry = await self._cache.async_get(path)
+        if entry is None:
+            # Let the browser try the original instead of showing a broken image
+            raise web.HTTPFound(f"{IMG_BASE}{path}")
+
+        cache_control = MUTABLE_CACHE_CONTROL if _is_mutable(path) else IMMUTABLE_CACHE_CONTROL
+        return web.FileResponse(self._cache.file_path(entry), headers={"Cache-Control": cache_control})
@@ -0,0 +1,310 @@
+"""Compact records parsed once per refresh and shared by all sensors."""
+import heapq
+import re
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from operator import attrgetter
+
+from .const import IMAGE_PROXY_URL, IMG_BASE
+
+RECENT_BADGE_COUNT = 5
+
+
+def safe_int(value, default=0):
+    try:
+        return int(value) if value is not None else default
+    except (ValueError, TypeError):
+        return default
+
+
+@lru_cache(maxsize=256)
+def _to_local_timestamp(raw: str) -> str | None:
+    if not raw:
+        return None
+    try:
+        dt = datetime.strptime(raw, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        return dt.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        pass
+    try:
+        dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return raw
+
+
+@lru_cache(maxsize=256)
+def parse_last_played(raw):
+    """Parse LastPlayed ("YYYY-MM-DD HH:MM:SS", UTC) into an aware datetime."""
+    if not raw:
+        return None
+    try:
+        return datetime.strptime(raw, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+# Image paths the local proxy will fetch from IMG_BASE
+IMAGE_PATH_RE = re.compile(r"^/(Images|Badge|UserPic)/[A-Za-z0-9_.\-]+\.(png|jpe?g|gif|webp)$", re.IGNORECASE)
+
+# Proxy paths image_url() has handed out, newest last. The proxy fetches
+# nothing else, so it can't be made to download arbitrary images.
+PUBLISHED_IMAGES_MAX = 4096
+_published_images = OrderedDict()
+
+
+def image_url(path):
+    """URL for an IMG_BASE image path, through the local proxy when it is allowed to serve it."""
+    if not path:
+        return None
+    if IMAGE_PATH_RE.match(path):
+        _published_images[path] = None
+        _published_images.move_to_end(path)
+        if len(_published_images) > PUBLISHED_IMAGES_MAX:
+            _published_images.popitem(last=False)
+        return f"{IMAGE_PROXY_URL}{path}"
+    return f"{IMG_BASE}{path}"
+
+
+def is_published_image(path):
+    return path in _published_images
+
+
+class BadgeRecord:
+    __slots__ = ("achievement_id", "title", "badge_name", "date")
+
+    def __init__(self, achievement_id, title, badge_name, date):
+        self.achievement_id = achievement_id
+        self.title = title
+        self.badge_name = badge_name
+        self.date = date
+
+    def as_dict(self):
+        # Kept in the raw game entry and the snapshot, so no presentation URLs
+        return {
+            "achievement_id": self.achievement_id,
+            "title": self.title,
+            "badge_name": self.badge_name,
+            "date": self.date,
+        }
+
+
+def badge_attributes(badge):
+    """Sensor attributes for a badge from the raw game entry."""
+    return {
+        "title": badge.get("title"),
+        "badge_icon": image_url(f"/Badge/{badge['badge_name']}.png") if badge.get("badge_name") else None,
+        "achievement_url": f"https://retroachievements.org/Achievement/{badge.get('achievement_id')}",
+        "date": badge.get("date"),
+    }
+
+
+class ProgressRecord:
+    """A user's badges and completion for one game (API_GetGameInfoAndUserProgress)."""
+
+    __slots__ = ("badges", "completion", "completion_hardcore", "attributes")
+
+    def __init__(self, badges, completion="unknown", completion_hardcore="unknown"):
+        self.badges = tuple(badges)
+        self.completion = completion
+        self.completion_hardcore = completion_hardcore
+        # Merged into the raw game entry, so built once per fetch
+        self.attributes = {
+            "recent_badges": [badge.as_dict() for badge in self.badges],
+            "completion_percentage": completion,
+            "completion_percentage_hardcore": completion_hardcore,
+        }
+
+    def merged(self, badges, completion, completion_hardcore):
+        """A copy with newly earned badges folded in, without refetching the game."""
+        by_id = {badge.achievement_id: badge for badge in self.badges}
+        by_id.update((badge.achievement_id, badge) for badge in badges)
+        return ProgressRecord(
+            heapq.nlargest(RECENT_BADGE_COUNT, by_id.values(), key=attrgetter("date")),
+            completion,
+            completion_hardcore,
+        )
+
+    @classmethod
+    def from_api(cls, badge_data):
+        # A game without achievements sends [] (an empty PHP array) instead of {}
+        achievements = badge_data.get("Achievements") or {}
+        if isinstance(achievements, dict):
+            achievements = achievements.values()
+        earned = (
+            BadgeRecord(str(ach.get("ID")), ach.get("Title"), ach.get("BadgeName"), ach.get("DateEarned"))
+            for ach in achievements
+            if isinstance(ach, dict) and ach.get("DateEarned") and ach.get("BadgeName")
+        )
+        # Only the newest few are shown, no need to sort the whole set
+        badges = heapq.nlargest(RECENT_BADGE_COUNT, earned, key=attrgetter("date"))
+        return cls(
+            badges,
+            badge_data.get("UserCompletion", "unknown"),
+            badge_data.get("UserCompletionHardcore", "unknown"),
+        )
+
+
+UNKNOWN_PROGRESS = ProgressRecord(())
+
+
+def achievement_details(badge_data):
+    """Every achievement of a game (API_GetGameInfoAndUserProgress), in display order."""
+    achievements = badge_data.get("Achievements") or {}
+    if isinstance(achievements, dict):
+        achievements = achievements.values()
+    details = [
+        {
+            "id": safe_int(ach.get("ID")),
+            "title": ach.get("Title"),
+            "description": ach.get("Description"),
+            "points": safe_int(ach.get("Points")),
+            "true_ratio": safe_int(ach.get("TrueRatio")),
+            "type": ach.get("type"),
+            "badge_icon": image_url(f"/Badge/{ach['BadgeName']}.png") if ach.get("BadgeName") else None,
+            "achievement_url": f"https://retroachievements.org/achievement/{ach.get('ID')}",
+            "display_order": safe_int(ach.get("DisplayOrder")),
+            "num_awarded": safe_int(ach.get("NumAwarded")),
+            "num_awarded_hardcore": safe_int(ach.get("NumAwardedHardcore")),
+            "earned": bool(ach.get("DateEarned")),
+            "earned_hardcore": bool(ach.get("DateEarnedHardcore")),
+            "date_earned": ach.get("DateEarned"),
+            "date_earned_hardcore": ach.get("DateEarnedHardcore"),
+        }
+        for ach in achievements
+        if isinstance(ach, dict)
+    ]
+    details.sort(key=lambda ach: (ach["display_order"], ach["id"]))
+    return details
+
+
+def completion_percentage(achieved, possible):
+    """Format like the API's UserCompletion ("41.67%")."""
+    achieved, possible = safe_int(achieved), safe_int(possible)
+    if not possible:
+        return None
+    return f"{achieved / possible * 100:.2f}%"
+
+
+def badge_from_unlock(unlock):
+    """BadgeRecord for an API_GetUserRecentAchievements entry."""
+    return BadgeRecord(str(unlock.get("AchievementID")), unlock.get("Title"), unlock.get("BadgeName"), unlock.get("Date"))
+
+
+def unlock_event_data(username, unlock):
+    """Payload of the achievement unlocked event."""
+    return {
+        "username": username,
+        "achievement_id": safe_int(unlock.get("AchievementID")),
+        "title": unlock.get("Title"),
+        "description": unlock.get("Description"),
+        "points": safe_int(unlock.get("Points")),
+        "hardcore": bool(safe_int(unlock.get("HardcoreMode"))),
+        "badge_icon": image_url(unlock.get("BadgeURL")),
+        "achievement_url": f"https://retroachievements.org/achievement/{unlock.get('AchievementID')}",
+        "game_id": safe_int(unlock.get("GameID")),
+        "game": unlock.get("GameTitle"),
+        "console": unlock.get("ConsoleName"),
+        "date": unlock.get("Date"),
+    }
+
+
+class GameRecord:
+    """One recently played game with its sensor attributes precomputed."""
+
+    __slots__ = ("game_id", "title", "last_played", "attributes")
+
+    def __init__(self, game, consoles=None):
+        game_id = game.get("GameID")
+        last_played_raw = game.get("LastPlayed")
+        console_name = game.get("ConsoleName", "Unknown")
+
+        self.game_id = game_id
+        self.title = game.get("Title", "Unknown Game")
+        self.last_played = parse_last_played(last_played_raw)
+        self.attributes = {
+            "last_played_local": _to_local_timestamp(last_played_raw),
+            "achievements_total": safe_int(game.get("AchievementsTotal")),
+            "achievements_unlocked": safe_int(game.get("NumAchieved")),
+            "total_achievements": safe_int(game.get("NumPossibleAchievements")),
+            "score_achieved": safe_int(game.get("ScoreAchieved")),
+            "possible_score": safe_int(game.get("PossibleScore")),
+            "console": game.get("ConsoleName", "Unknown"),
+            "console_icon": consoles.icon(game.get("ConsoleID"), console_name) if consoles else None,
+            "console_url": f"https://retroachievements.org/gameList.php?c={game.get('ConsoleID')}" if game.get("ConsoleID") else None,
+            "url": f"https://retroachievements.org/game/{game_id}" if game_id else None,
+            "developer": game.get("Developer") or "Unknown",
+            "genre": game.get("Genre") or "Unknown",
+            "released": game.get("Released") or "Unknown",
+            "game_icon": image_url(game.get("GameIcon")),
+            "box_art": image_url(game.get("ImageBoxArt")),
+            "title_screen": image_url(game.get("ImageTitle")),
+            "in_game_image": image_url(game.get("ImageIngame")),
+            "last_played_utc": last_played_raw,
+            "recent_badges": [badge_attributes(badge) for badge in game.get("recent_badges", ())],
+            "completion_percentage": game.get("completion_percentage", "unknown"),
+            "completion_percentage_hardcore": game.get("completion_percentage_hardcore", "unknown"),
+        }
+
+
+class AwardRecord:
+    __slots__ = ("game_id", "title", "award_type", "badge_url")
+
+    def __init__(self, game_id, award):
+        self.game_id = game_id
+        self.title = award.get("Title") if award else None
+        self.award_type = award.get("AwardType") if award else None
+        self.badge_url = award.get("BadgeURL") if award else None
+
+    def as_dict(self):
+        return {
+            "game_id": self.game_id,
+            "badge_icon": image_url(self.badge_url),
+            "title": self.title,
+            "type": self.award_type,
+        }
+
+
+def parse_awards(awarded):
+    if isinstance(awarded, dict):
+        return tuple(AwardRecord(game_id, award) for game_id, award in awarded.items())
+    if isinstance(awarded, list):
+        return tuple(
+            AwardRecord(award.get("GameID"), award) if isinstance(award, dict) else AwardRecord(None, None)
+            for award in awarded
+        )
+    return ()
+
+
+class RetroAchievementsSnapshot:
+    """Everything the sensors render, parsed from one refresh."""
+
+    __slots__ = (
+        "summary", "games", "awards", "aotw", "aotw_game", "aotw_unlock", "aotw_end_at", "history", "consoles"
+    )
+
+    def __init__(self, data, consoles=None):
+        summary = data.get("summary")
+        self.summary = summary if isinstance(summary, dict) else {}
+        self.consoles = consoles
+        self.games = tuple(GameRecord(game, consoles) for game in data.get("recent_games") or ())
+        self.awards = parse_awards(self.summary.get("Awarded"))
+        self.aotw = data.get("aotw") or {}
+        self.aotw_game = data.get("aotw_game") or {}
+        self.aotw_unlock = data.get("aotw_unlock")
+        self.aotw_end_at = data.get("aotw_end_at")
+        # Statistics from the local history index, when enabled
+        self.history = data.get("history")
+
+    @property
+    def active_game(self):
+        return self.games[0] if self.games else None
+
+    def console_icon(self, console_id=None, name=None):
+        return self.consoles.icon(console_id, name) if self.consoles else None
+
+
+EMPTY_SNAPSHOT = RetroAchievementsSnapshot({})
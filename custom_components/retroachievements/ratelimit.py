@@ -0,0 +1,79 @@
+"""Request budget shared by every RetroAchievements API call."""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RequestBudget:
+    """Token bucket that hands out requests in priority order.
+
+    Tokens refill at requests_per_minute / 60 per second and the bucket holds at
+    most one minute's worth, so a burst (like setup) can't exceed the budget by
+    more than that. When the bucket is empty, callers queue and are released
+    lowest priority value first, FIFO within the same priority.
+    """
+
+    def __init__(self, requests_per_minute):
+        self.requests_per_minute = requests_per_minute
+        self._rate = requests_per_minute / 60
+        self._capacity = float(requests_per_minute)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._counter = itertools.count()
+        self._timer = None
+
+    def set_rate(self, requests_per_minute):
+        self._refill()
+        self.requests_per_minute = requests_per_minute
+        self._rate = requests_per_minute / 60
+        self._capacity = float(requests_per_minute)
+        self._tokens = min(self._tokens, self._capacity)
+
+    @property
+    def remaining(self):
+        """Requests that can be sent right now without waiting."""
+        self._refill()
+        return int(self._tokens)
+
+    @property
+    def queued(self):
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority):
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), fut))
+        _LOGGER.debug("Request budget exhausted, %s requests queued", len(self._waiters))
+        self._schedule()
+        # A cancelled waiter is skipped when its turn comes
+        await fut
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _schedule(self):
+        if self._timer is None and self._waiters:
+            delay = max(0.0, (1 - self._tokens) / self._rate)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._release)
+
+    def _release(self):
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue
+            self._tokens -= 1
+            fut.set_result(None)
+        self._schedule()
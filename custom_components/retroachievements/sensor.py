@@ -1,272 +1,94 @@
-import logging
-from datetime import datetime, timedelta, timezone
-from homeassistant.helpers.entity import Entity
-from homeassistant.util import Throttle
-import requests
-
-from .const import CONF_USERNAME, CONF_API_KEY, CONF_NUM_GAMES
-
-_LOGGER = logging.getLogger(__name__)
-
-MIN_TIME_BETWEEN_UPDATES = timedelta(seconds=60)
-IMG_BASE = "https://retroachievements.org"
-BASE_API = "https://retroachievements.org/API"
-
-
-def safe_int(value, default=0):
-    try:
-        return int(value) if value is not None else default
-    except (ValueError, TypeError):
-        return default
-
-
-def _to_local_timestamp(raw: str) -> str | None:
-    if not raw:
-        return None
-    try:
-        dt = datetime.strptime(raw, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
-        return dt.astimezone().strftime("%Y-%m-%d %H:%M:%S")
-    except Exception:
-        pass
-    try:
-        dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt.astimezone().strftime("%Y-%m-%d %H:%M:%S")
-    except Exception:
-        return raw
-
-
-class RetroAchievementsData:
-    def __init__(self, username, api_key, num_games):
-        self._username = username
-        self._api_key = api_key
-        self._num_games = num_games
-        self.data = {}
-
-    @Throttle(MIN_TIME_BETWEEN_UPDATES)
-    def update(self):
-        try:
-            # --- User summary ---
-            summary_url = f"{BASE_API}/API_GetUserSummary.php?z={self._username}&y={self._api_key}&u={self._username}"
-            summary_resp = requests.get(summary_url, timeout=20)
-            summary_resp.raise_for_status()
-            self.data["summary"] = summary_resp.json()
-
-            # --- Achievement of the Week ---
-            try:
-                aotw_url = f"{BASE_API}/API_GetAchievementOfTheWeek.php?y={self._api_key}"
-                aotw_resp = requests.get(aotw_url, timeout=20)
-                aotw_resp.raise_for_status()
-                self.data["aotw"] = aotw_resp.json()
-            except Exception as e:
-                _LOGGER.debug("Failed to fetch AOTW: %s", e)
-                self.data["aotw"] = {}
-
-            # --- Recently played games ---
-            recent_url = f"{BASE_API}/API_GetUserRecentlyPlayedGames.php?z={self._username}&y={self._api_key}&u={self._username}&c=15"
-            recent_resp = requests.get(recent_url, timeout=20)
-            recent_resp.raise_for_status()
-            recent = recent_resp.json()
-            if not isinstance(recent, list):
-                _LOGGER.debug("Recent games payload not a list: %s", recent)
-                recent = []
-
-            recent_sorted = sorted(recent, key=lambda g: g.get("LastPlayed", ""), reverse=True)
-            recent_sorted = recent_sorted[:self._num_games]
-
-            for game in recent_sorted:
-                game_id = game.get("GameID")
-                if not game_id:
-                    continue
-                try:
-                    full_url = f"{BASE_API}/API_GetGame.php?i={game_id}&y={self._api_key}"
-                    full_resp = requests.get(full_url, timeout=20)
-                    full_resp.raise_for_status()
-                    full_game = full_resp.json()
-                    if isinstance(full_game, dict):
-                        for key in ["GameIcon", "ImageBoxArt", "ImageTitle", "ImageIngame"]:
-                            if key in game and key not in full_game:
-                                full_game[key] = game[key]
-                        game.update(full_game)
-                except Exception as e:
-                    _LOGGER.debug("Failed to fetch full game info for %s: %s", game.get("Title"), e)
-
-                try:
-                    badge_icon = f"{BASE_API}/API_GetGameInfoAndUserProgress.php?g={game_id}&u={self._username}&y={self._api_key}"
-                    badge_resp = requests.get(badge_icon, timeout=20)
-                    badge_resp.raise_for_status()
-                    badge_data = badge_resp.json()
-
-                    achievements = badge_data.get("Achievements", {})
-                    unlocked = []
-                    for ach_id, ach in achievements.items():
-                        date_earned = ach.get("DateEarned")
-                        badge_name = ach.get("BadgeName")
-                        if date_earned and badge_name:
-                            unlocked.append(
-                                {
-                                    "title": ach.get("Title"),
-                                    "badge_icon": f"{IMG_BASE}/Badge/{badge_name}.png",
-                                    "achievement_url": f"https://retroachievements.org/Achievement/{ach_id}",
-                                    "date": date_earned,
-                                }
-                            )
-                    unlocked.sort(key=lambda x: x["date"], reverse=True)
-                    game["recent_badges"] = unlocked[:5]
-
-                    game["completion_percentage"] = badge_data.get("UserCompletion", "unknown")
-                    game["completion_percentage_hardcore"] = badge_data.get("UserCompletionHardcore", "unknown")
-
-                except Exception as e:
-                    _LOGGER.debug("Failed to fetch badges or completion for %s: %s", game.get("Title"), e)
-                    game["recent_badges"] = []
-                    game["completion_percentage"] = "unknown"
-                    game["completion_percentage_hardcore"] = "unknown"
-
-            self.data["recent_games"] = recent_sorted
-            self.data["active_game"] = recent_sorted[0] if recent_sorted else None
-
-        except Exception as e:
-            _LOGGER.error("Error updating RetroAchievements data: %s", e)
-
-
-# ---- Console icon mapping ----
-CONSOLE_ICON_MAP = {
-    "Amiga": "amiga.png",
-    "Arcade": "arc.png",
-    "Atari 2600": "2600.png",
-    "Atari 7800": "7800.png",
-    "Atari Lynx": "lynx.png",
-    "DOS": "dos.png",
-    "NES/Famicom": "nes.png",
-    "SNES/Super Famicom": "snes.png",
-    "Game Boy": "gb.png",
-    "Game Boy Color": "gbc.png",
-    "Game Boy Advance": "gba.png",
-    "GameCube": "gc.png",
-    "Game Gear": "gamegear.png",
-    "Mega Drive/Genesis": "md.png",
-    "Master System": "sms.png",
-    "Nintendo 64": "n64.png",
-    "Nintendo DS": "ds.png",
-    "Nintendo 3DS": "3ds.png",
-    "Wii": "wii.png",
-    "Wii U": "wiiu.png",
-    "PlayStation": "ps1.png",
-    "PlayStation 2": "ps2.png",
-    "PlayStation Portable": "psp.png",
-    "Xbox": "xbox.png",
-    "Sega Saturn": "sat.png",
-    "Dreamcast": "dc.png",
-}
-def get_console_icon(console_name: str) -> str | None:
-    if console_name in CONSOLE_ICON_MAP:
-        return f"https://static.retroachievements.org/assets/images/system/{CONSOLE_ICON_MAP[console_name]}"
-    return None
+from datetime import datetime
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.core import callback
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DATA_API_SENSORS_ENTRY, DOMAIN, ONLINE_WINDOW
+from .models import EMPTY_SNAPSHOT, _to_local_timestamp, image_url, safe_int
+
+# Bulky attributes that are still shown on the entity but kept out of the recorder
+GAME_UNRECORDED_ATTRIBUTES = frozenset(
+    {"recent_badges", "game_icon", "box_art", "title_screen", "in_game_image", "console_icon"}
+)
 
 
 # --- Sensors ---
-class RetroAchievementsAOTWSensor(Entity):
-    """Separate sensor entity for Achievement of the Week."""
+class RetroAchievementsEntity(CoordinatorEntity):
+    """Base for sensors that render the coordinator's latest snapshot."""
 
-    def __init__(self, ra_data):
-        self._ra_data = ra_data
+    # Rendered until the coordinator has data
+    _empty_data = EMPTY_SNAPSHOT
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
         self._state = None
         self._attrs = {}
-
-    @property
-    def name(self):
-        return "RetroAchievements Achievement of the Week"
+        # What the state machine last got from us
+        self._written = None
 
     @property
     def state(self):
         return self._state
 
+    @property
+    def available(self):
+        # Keep serving the last good data (marked stale) while the API is down
+        return self.coordinator.data is not None or self.coordinator.last_update_success
+
     @property
     def extra_state_attributes(self):
+        if self.coordinator.stale and self._attrs:
+            last_success = self.coordinator.last_success_at
+            return {**self._attrs, "stale": True, "last_refreshed": last_success.isoformat() if last_success else None}
         return self._attrs
 
-    def update(self):
-        self._ra_data.update()
-        aotw = self._ra_data.data.get("aotw", {}) or {}
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._update_from_data(self.coordinator.data or self._empty_data)
+        self._written = self._rendered()
+
+    def _rendered(self):
+        return (self.available, self.coordinator.stale, self._state, self._attrs)
+
+    @callback
+    def _handle_coordinator_update(self):
+        self._update_from_data(self.coordinator.data or self._empty_data)
+        rendered = self._rendered()
+        if rendered == self._written:
+            # Nothing the state machine would see changed, skip the write
+            return
+        self._written = rendered
+        super()._handle_coordinator_update()
+
+    def _update_from_data(self, data):
+        raise NotImplementedError
+
+
+class RetroAchievementsAOTWSensor(RetroAchievementsEntity):
+    """Separate sensor entity for Achievement of the Week."""
+
+    _unrecorded_attributes = frozenset({"badge_icon", "game_icon", "game_box_art", "console_icon"})
+
+    @property
+    def name(self):
+        return "RetroAchievements Achievement of the Week"
+
+    def _update_from_data(self, data):
+        aotw = data.aotw
         achievement = aotw.get("Achievement", {}) or {}
         game = aotw.get("Game", {}) or {}
         console = aotw.get("Console", {}) or {}
 
         # Prepare game images
-        game_box_art = None
-        game_icon = None
         game_id = game.get("ID")
-        if game_id:
-            try:
-                full_url = f"{BASE_API}/API_GetGame.php?i={game_id}&y={self._ra_data._api_key}"
-                full_resp = requests.get(full_url, timeout=20)
-                full_resp.raise_for_status()
-                full_game = full_resp.json() or {}
-                game_box_art = f"{IMG_BASE}{full_game.get('ImageBoxArt')}" if full_game.get("ImageBoxArt") else None
-                game_icon = f"{IMG_BASE}{full_game.get('GameIcon')}" if full_game.get("GameIcon") else None
-            except Exception as e:
-                _LOGGER.debug("Could not fetch full game info for AOTW box art: %s", e)
-
-        # Parse and compute AOTW time window
-        start_raw = aotw.get("StartAt")
-        end_iso = None
-        if start_raw:
-            try:
-                start_dt = datetime.fromisoformat(start_raw.replace("Z", "+00:00"))
-                end_dt = start_dt + timedelta(days=7)
-                end_iso = end_dt.isoformat()
-            except Exception as e:
-                _LOGGER.debug("Could not parse start_at for AOTW: %s", e)
-
-        # Robustly handle unlocking list shapes
-        unlocks_raw = aotw.get("Unlocks")
-        unlocks_list = []
-        if isinstance(unlocks_raw, list):
-            unlocks_list = unlocks_raw
-        elif isinstance(unlocks_raw, dict):
-            # sometimes APIs return dicts — convert to list of values
-            try:
-                unlocks_list = list(unlocks_raw.values())
-            except Exception:
-                unlocks_list = []
-
-        # Debug logging to inspect payload (enable debug logging for this component to see)
-        _LOGGER.debug("AOTW payload keys: %s", list(aotw.keys()) if isinstance(aotw, dict) else aotw)
-        try:
-            _LOGGER.debug("AOTW unlocks length: %s", len(unlocks_list))
-            _LOGGER.debug("Sample unlocks (first 3): %s", unlocks_list[:3])
-        except Exception:
-            pass
-
-        # Determine username safely (avoid attribute errors)
-        username = getattr(self._ra_data, "_username", None)
-        if not username:
-            # fallback to summary user if available
-            username = self._ra_data.data.get("summary", {}).get("User")
-
-        summary_ulid = self._ra_data.data.get("summary", {}).get("ULID")
-
-        # Find a matching unlock entry for this user (case-insensitive username or ULID)
-        matched = None
-        if username and isinstance(unlocks_list, list):
-            uname_lower = username.lower()
-            for entry in unlocks_list:
-                if not isinstance(entry, dict):
-                    continue
-                u_user = entry.get("User")
-                if u_user and isinstance(u_user, str) and u_user.lower() == uname_lower:
-                    matched = entry
-                    break
-
-        if not matched and summary_ulid and isinstance(unlocks_list, list):
-            for entry in unlocks_list:
-                if not isinstance(entry, dict):
-                    continue
-                if entry.get("ULID") == summary_ulid:
-                    matched = entry
-                    break
+        full_game = data.aotw_game
+        game_box_art = image_url(full_game.get("ImageBoxArt"))
+        game_icon = image_url(full_game.get("GameIcon"))
+
+        end_at = data.aotw_end_at
+        end_iso = end_at.isoformat() if end_at else None
+        matched = data.aotw_unlock
 
         # If found, extract unlock info; otherwise use safe defaults
         unlocked = bool(matched)
@@ -281,7 +103,7 @@ class RetroAchievementsAOTWSensor(Entity):
         self._attrs = {
             "description": achievement.get("Description", "Unknown"),
             "points": safe_int(achievement.get("Points")),
-            "badge_icon": f"{IMG_BASE}{achievement.get('BadgeURL')}" if achievement.get("BadgeURL") else None,
+            "badge_icon": image_url(achievement.get("BadgeURL")),
             "achievement_url": f"https://retroachievements.org/achievement/{achievement.get('ID')}" if achievement.get("ID") else None,
             "game": game.get("Title", "Unknown"),
             "game_url": f"https://retroachievements.org/game/{game_id}" if game_id else None,
@@ -289,7 +111,7 @@ class RetroAchievementsAOTWSensor(Entity):
             "game_box_art": game_box_art,
             "console": console.get("Title", "Unknown"),
             "console_url": f"https://retroachievements.org/gameList.php?c={console.get('ID')}" if console.get("ID") else None,
-            "console_icon": get_console_icon(console.get("Title", "Unknown")),
+            "console_icon": data.console_icon(console.get("ID"), console.get("Title")),
             "start_at": aotw.get("StartAt"),
             "end_at": end_iso,
             "total_players": safe_int(aotw.get("TotalPlayers")),
@@ -302,191 +124,72 @@ class RetroAchievementsAOTWSensor(Entity):
             "aotw_date_awarded_local": date_awarded_local,
         }
 
-class RetroAchievementsActiveGameSensor(Entity):
-    def __init__(self, ra_data):
-        self._ra_data = ra_data
-        self._state = None
-        self._attrs = {}
+class RetroAchievementsActiveGameSensor(RetroAchievementsEntity):
+    _unrecorded_attributes = GAME_UNRECORDED_ATTRIBUTES
 
     @property
     def name(self):
         return "RetroAchievements Most Recently Played Game"
 
-    @property
-    def state(self):
-        return self._state
-
-    @property
-    def extra_state_attributes(self):
-        return self._attrs
-
-    def update(self):
-        self._ra_data.update()
-        game = self._ra_data.data.get("active_game")
-        summary = self._ra_data.data.get("summary") or {}
+    def _update_from_data(self, data):
+        game = data.active_game
         if game:
-            game_id = game.get("GameID")
-            last_played_raw = game.get("LastPlayed")
-            last_played_local = _to_local_timestamp(last_played_raw)
-            console_name = game.get("ConsoleName", "Unknown")
-
-            self._state = game.get("Title", "Unknown Game")
-            self._attrs = {
-                "rich_presence": summary.get("RichPresenceMsg"),
-                "last_played_local": last_played_local,
-                "achievements_total": safe_int(game.get("AchievementsTotal")),
-                "achievements_unlocked": safe_int(game.get("NumAchieved")),
-                "total_achievements": safe_int(game.get("NumPossibleAchievements")),
-                "score_achieved": safe_int(game.get("ScoreAchieved")),
-                "possible_score": safe_int(game.get("PossibleScore")),
-                "console": game.get("ConsoleName", "Unknown"),
-                "console_icon": get_console_icon(console_name),
-                "console_url": f"https://retroachievements.org/gameList.php?c={game.get('ConsoleID')}" if game.get("ConsoleID") else None,
-                "url": f"https://retroachievements.org/game/{game_id}" if game_id else None,
-                "developer": game.get("Developer") or "Unknown",
-                "genre": game.get("Genre") or "Unknown",
-                "released": game.get("Released") or "Unknown",
-                "game_icon": f"{IMG_BASE}{game.get('GameIcon')}" if game.get("GameIcon") else None,
-                "box_art": f"{IMG_BASE}{game.get('ImageBoxArt')}" if game.get("ImageBoxArt") else None,
-                "title_screen": f"{IMG_BASE}{game.get('ImageTitle')}" if game.get("ImageTitle") else None,
-                "in_game_image": f"{IMG_BASE}{game.get('ImageIngame')}" if game.get("ImageIngame") else None,
-                "last_played_utc": last_played_raw,
-                "recent_badges": game.get("recent_badges", []),
-                "completion_percentage": game.get("completion_percentage", "unknown"),
-                "completion_percentage_hardcore": game.get("completion_percentage_hardcore", "unknown"),
-            }
+            self._state = game.title
+            self._attrs = {"rich_presence": data.summary.get("RichPresenceMsg"), **game.attributes}
         else:
             self._state = "No Game"
             self._attrs = {}
 
 
-class RetroAchievementsRecentGameSensor(Entity):
-    def __init__(self, ra_data, index):
-        self._ra_data = ra_data
+class RetroAchievementsRecentGameSensor(RetroAchievementsEntity):
+    _unrecorded_attributes = GAME_UNRECORDED_ATTRIBUTES
+
+    def __init__(self, coordinator, index):
         self._index = index
-        self._state = None
-        self._attrs = {}
+        super().__init__(coordinator)
 
     @property
     def name(self):
         return f"RetroAchievements Last Played Game {self._index + 1}"
 
-    @property
-    def state(self):
-        return self._state
-
-    @property
-    def extra_state_attributes(self):
-        return self._attrs
-
-    def update(self):
-        self._ra_data.update()
-        games = self._ra_data.data.get("recent_games", [])
-        if len(games) > self._index:
-            game = games[self._index]
-            game_id = game.get("GameID")
-            last_played_raw = game.get("LastPlayed")
-            last_played_local = _to_local_timestamp(last_played_raw)
-            console_name = game.get("ConsoleName", "Unknown")
-
-            self._state = game.get("Title", "Unknown Game")
-            self._attrs = {
-                "last_played_local": last_played_local,
-                "achievements_total": safe_int(game.get("AchievementsTotal")),
-                "achievements_unlocked": safe_int(game.get("NumAchieved")),
-                "total_achievements": safe_int(game.get("NumPossibleAchievements")),
-                "score_achieved": safe_int(game.get("ScoreAchieved")),
-                "possible_score": safe_int(game.get("PossibleScore")),
-                "console": game.get("ConsoleName", "Unknown"),
-                "console_icon": get_console_icon(console_name),
-                "console_url": f"https://retroachievements.org/gameList.php?c={game.get('ConsoleID')}" if game.get("ConsoleID") else None,
-                "url": f"https://retroachievements.org/game/{game_id}" if game_id else None,
-                "developer": game.get("Developer") or "Unknown",
-                "genre": game.get("Genre") or "Unknown",
-                "released": game.get("Released") or "Unknown",
-                "game_icon": f"{IMG_BASE}{game.get('GameIcon')}" if game.get("GameIcon") else None,
-                "box_art": f"{IMG_BASE}{game.get('ImageBoxArt')}" if game.get("ImageBoxArt") else None,
-                "title_screen": f"{IMG_BASE}{game.get('ImageTitle')}" if game.get("ImageTitle") else None,
-                "in_game_image": f"{IMG_BASE}{game.get('ImageIngame')}" if game.get("ImageIngame") else None,
-                "last_played_utc": last_played_raw,
-                "recent_badges": game.get("recent_badges", []),
-                "completion_percentage": game.get("completion_percentage", "unknown"),
-                "completion_percentage_hardcore": game.get("completion_percentage_hardcore", "unknown"),
-            }
+    def _update_from_data(self, data):
+        if len(data.games) > self._index:
+            game = data.games[self._index]
+            self._state = game.title
+            self._attrs = game.attributes
         else:
             self._state = "Unavailable"
             self._attrs = {}
 
 
-class RetroAchievementsUserSummarySensor(Entity):
-    def __init__(self, ra_data):
-        self._ra_data = ra_data
-        self._state = None
-        self._attrs = {}
+class RetroAchievementsUserSummarySensor(RetroAchievementsEntity):
+    # Point totals have their own sensors with long-term statistics
+    _unrecorded_attributes = frozenset({"awards", "profile_pic", "total_points", "softcore_points", "true_points"})
 
     @property
     def name(self):
         return "RetroAchievements User Summary"
 
-    @property
-    def state(self):
-        return self._state
-
-    @property
-    def extra_state_attributes(self):
-        return self._attrs
-
-    def update(self):
-        self._ra_data.update()
-        data = self._ra_data.data.get("summary") or {}
-        active_game = self._ra_data.data.get("active_game")
+    def _update_from_data(self, data):
+        active_game = data.active_game
+        awards = [award.as_dict() for award in data.awards]
+        data = data.summary
         now = datetime.now().astimezone()
 
         status = "Offline"
         last_online = None
 
-        if active_game:
-            last_played_raw = active_game.get("LastPlayed")
-            last_played_local_str = _to_local_timestamp(last_played_raw)
-            if last_played_local_str:
-                try:
-                    last_played_dt = datetime.strptime(
-                        last_played_local_str, "%Y-%m-%d %H:%M:%S"
-                    ).astimezone()
-                    last_online = last_played_dt.strftime("%Y-%m-%d %H:%M")
-                    if (now - last_played_dt) <= timedelta(minutes=5):
-                        status = "Online"
-                except Exception:
-                    pass
+        if active_game and active_game.last_played:
+            last_played_dt = active_game.last_played.astimezone()
+            last_online = last_played_dt.strftime("%Y-%m-%d %H:%M")
+            if (now - last_played_dt) <= ONLINE_WINDOW:
+                status = "Online"
 
         if data:
-            self._state = data.get("User", self._ra_data._username)
-
-            awards = []
-            awarded = data.get("Awarded")
-            if isinstance(awarded, dict):
-                for game_id, award in awarded.items():
-                    awards.append(
-                        {
-                            "game_id": game_id,
-                            "badge_icon": f"{IMG_BASE}{award.get('BadgeURL')}" if award and award.get("BadgeURL") else None,
-                            "title": award.get("Title") if award else None,
-                            "type": award.get("AwardType") if award else None,
-                        }
-                    )
-            elif isinstance(awarded, list):
-                for award in awarded:
-                    awards.append(
-                        {
-                            "game_id": award.get("GameID") if isinstance(award, dict) else None,
-                            "badge_icon": f"{IMG_BASE}{award.get("BadgeURL")}" if isinstance(award, dict) and award.get("BadgeURL") else None,
-                            "title": award.get("Title") if isinstance(award, dict) else None,
-                            "type": award.get("AwardType") if isinstance(award, dict) else None,
-                        }
-                    )
+            self._state = data.get("User", self.coordinator.username)
 
             self._attrs = {
-                "username": data.get("User", self._ra_data._username),
+                "username": data.get("User", self.coordinator.username),
                 "member_since": data.get("MemberSince"),
                 "motto": data.get("Motto"),
                 "rank": data.get("Rank") or "Unranked",
@@ -497,7 +200,7 @@ class RetroAchievementsUserSummarySensor(Entity):
                 "awards": awards,
                 "status": status,
                 "last_online": last_online,
-                "profile_pic": f"{IMG_BASE}{data.get("UserPic")}" if data.get("UserPic") else None,
+                "profile_pic": image_url(data.get("UserPic")),
                 "recently_played_count": safe_int(data.get("RecentlyPlayedCount", 0)),
             }
         else:
@@ -505,20 +208,307 @@ class RetroAchievementsUserSummarySensor(Entity):
             self._attrs = {}
 
 
+class RetroAchievementsPointsSensor(SensorEntity, RetroAchievementsEntity):
+    """A point total from the user summary, kept by the recorder as hourly statistics."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "points"
+
+    def __init__(self, coordinator, entry_id, key, label):
+        self._key = key
+        self._label = label
+        # Statistics follow the entity_id, so keep it tied to this account
+        self._attr_unique_id = f"{entry_id}_{key}"
+        super().__init__(coordinator)
+
+    @property
+    def name(self):
+        return f"RetroAchievements {self.coordinator.username} {self._label}"
+
+    @property
+    def native_value(self):
+        return self._state
+
+    def _update_from_data(self, data):
+        value = data.summary.get(self._key)
+        self._state = safe_int(value) if value is not None else None
+        self._attrs = {}
+
+
+class RetroAchievementsHistorySensor(RetroAchievementsEntity):
+    """Base for sensors computed from the local unlock history."""
+
+    def _update_from_data(self, data):
+        if data.history is None:
+            self._state = None
+            self._attrs = {}
+        else:
+            self._update_from_history(data.history)
+
+    def _update_from_history(self, history):
+        raise NotImplementedError
+
+
+class RetroAchievementsPointsTodaySensor(RetroAchievementsHistorySensor):
+    @property
+    def name(self):
+        return "RetroAchievements Points Today"
+
+    @property
+    def unit_of_measurement(self):
+        return "points"
+
+    def _update_from_history(self, history):
+        self._state = history["points_today"]
+        self._attrs = {"unlocks_today": history["unlocks_today"]}
+
+
+class RetroAchievementsPointsThisWeekSensor(RetroAchievementsHistorySensor):
+    @property
+    def name(self):
+        return "RetroAchievements Points This Week"
+
+    @property
+    def unit_of_measurement(self):
+        return "points"
+
+    def _update_from_history(self, history):
+        self._state = history["points_week"]
+        self._attrs = {"unlocks_this_week": history["unlocks_week"]}
+
+
+class RetroAchievementsUnlockStreakSensor(RetroAchievementsHistorySensor):
+    @property
+    def name(self):
+        return "RetroAchievements Unlock Streak"
+
+    @property
+    def unit_of_measurement(self):
+        return "days"
+
+    def _update_from_history(self, history):
+        self._state = history["current_streak"]
+        self._attrs = {
+            "longest_streak": history["longest_streak"],
+            "last_unlock_day": history["last_unlock_day"],
+        }
+
+
+class RetroAchievementsConsoleTotalsSensor(RetroAchievementsHistorySensor):
+    _unrecorded_attributes = frozenset({"consoles"})
+
+    @property
+    def name(self):
+        return "RetroAchievements Unlocks"
+
+    def _update_from_history(self, history):
+        self._state = history["total_unlocks"]
+        self._attrs = {
+            "consoles": history["consoles"],
+            # Counts only cover what has been backfilled so far
+            "history_since": history["backfilled_to"],
+        }
+
+
+class RetroAchievementsFriendSensor(RetroAchievementsEntity):
+    """A followed user's points and rich presence."""
+
+    _empty_data = {}
+    _unrecorded_attributes = frozenset(
+        {"profile_pic", "motto", "rich_presence", "last_game_id", "last_game_url"}
+    )
+
+    def __init__(self, coordinator, user):
+        self._user = user
+        super().__init__(coordinator)
+
+    @property
+    def name(self):
+        return f"RetroAchievements Friend {self._user}"
+
+    @property
+    def unit_of_measurement(self):
+        return "points"
+
+    @property
+    def available(self):
+        # Gone once the user is unfollowed
+        return super().available and (self.coordinator.data is None or self._user in self.coordinator.data)
+
+    def _update_from_data(self, data):
+        friend = data.get(self._user)
+        if not friend:
+            self._state = None
+            self._attrs = {}
+            return
+        last_game_id = friend.get("last_game_id")
+        self._state = friend["points"]
+        self._attrs = {
+            "username": self._user,
+            "softcore_points": friend["softcore_points"],
+            "true_points": friend.get("true_points"),
+            "rich_presence": friend.get("rich_presence"),
+            "last_game_id": last_game_id,
+            "last_game_url": f"https://retroachievements.org/game/{last_game_id}" if last_game_id else None,
+            "motto": friend.get("motto"),
+            "profile_pic": image_url(friend.get("user_pic")),
+            "profile_url": f"https://retroachievements.org/user/{self._user}",
+            "following_me": friend["following_me"],
+        }
+
+
+class RetroAchievementsFriendsLeaderboardSensor(RetroAchievementsEntity):
+    """The account's rank by points among the users it follows."""
+
+    _empty_data = {}
+    _unrecorded_attributes = frozenset({"leaderboard"})
+
+    def __init__(self, coordinator, account_coordinator):
+        self._account = account_coordinator
+        super().__init__(coordinator)
+
+    @property
+    def name(self):
+        return "RetroAchievements Friends Leaderboard"
+
+    def _update_from_data(self, data):
+        summary = self._account.data.summary if self._account.data else {}
+        entries = [(friend["points"], friend["softcore_points"], user) for user, friend in data.items()]
+        if summary:
+            entries.append((
+                safe_int(summary.get("TotalPoints")),
+                safe_int(summary.get("TotalSoftcorePoints")),
+                self._account.username,
+            ))
+        entries.sort(key=lambda entry: (-entry[0], -entry[1], entry[2].lower()))
+
+        leaderboard = [
+            {"rank": rank, "user": user, "points": points, "softcore_points": softcore_points}
+            for rank, (points, softcore_points, user) in enumerate(entries, 1)
+        ]
+        self._state = next((entry["rank"] for entry in leaderboard if entry["user"] == self._account.username), None)
+        self._attrs = {
+            "following": len(data),
+            "leader": leaderboard[0]["user"] if leaderboard else None,
+            "leaderboard": leaderboard,
+        }
+
+
+class RetroAchievementsDiagnosticEntity(RetroAchievementsEntity):
+    """Request statistics; stays available when refreshes fail, which is when they matter."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def available(self):
+        return True
+
+
+class RetroAchievementsApiRequestsSensor(RetroAchievementsDiagnosticEntity):
+    """Requests made by all accounts together."""
+
+    _unrecorded_attributes = frozenset({"endpoints"})
+
+    @property
+    def name(self):
+        return "RetroAchievements API Requests"
+
+    def _update_from_data(self, data):
+        stats = self.coordinator.client.stats
+        budget = self.coordinator.client.budget
+        self._state = stats.calls
+        self._attrs = {
+            "errors": stats.errors,
+            "budget_remaining": budget.remaining,
+            "budget_queued": budget.queued,
+            "endpoints": stats.as_dict(),
+        }
+
+
+class RetroAchievementsApiLatencySensor(RetroAchievementsDiagnosticEntity):
+    """Latency across all accounts' requests."""
+
+    @property
+    def name(self):
+        return "RetroAchievements API Latency"
+
+    @property
+    def unit_of_measurement(self):
+        return "ms"
+
+    def _update_from_data(self, data):
+        stats = self.coordinator.client.stats
+        self._state = stats.latency_ms(90)
+        self._attrs = {
+            "p50": stats.latency_ms(50),
+            "p99": stats.latency_ms(99),
+        }
+
+
+class RetroAchievementsRefreshDurationSensor(RetroAchievementsDiagnosticEntity):
+    @property
+    def name(self):
+        return "RetroAchievements Refresh Duration"
+
+    @property
+    def unit_of_measurement(self):
+        return "ms"
+
+    def _update_from_data(self, data):
+        duration = self.coordinator.last_refresh_duration
+        self._state = round(duration * 1000) if duration is not None else None
+        self._attrs = {
+            "last_update_success": self.coordinator.last_update_success,
+            "update_interval": str(self.coordinator.update_interval),
+        }
+
+
 # ---- HA entry point ----
 async def async_setup_entry(hass, entry, async_add_entities):
-    username = entry.data[CONF_USERNAME]
-    api_key = entry.data[CONF_API_KEY]
-    num_games = entry.data.get(CONF_NUM_GAMES, 5)
-
-    ra_data = RetroAchievementsData(username, api_key, num_games)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
 
     sensors = [
-        RetroAchievementsAOTWSensor(ra_data),
-        RetroAchievementsActiveGameSensor(ra_data),
-        RetroAchievementsUserSummarySensor(ra_data),
+        RetroAchievementsAOTWSensor(coordinator),
+        RetroAchievementsActiveGameSensor(coordinator),
+        RetroAchievementsUserSummarySensor(coordinator),
+        RetroAchievementsPointsSensor(coordinator, entry.entry_id, "TotalPoints", "Points"),
+        RetroAchievementsPointsSensor(coordinator, entry.entry_id, "TotalSoftcorePoints", "Softcore Points"),
+        RetroAchievementsPointsSensor(coordinator, entry.entry_id, "TotalTruePoints", "True Points"),
+        RetroAchievementsRefreshDurationSensor(coordinator),
     ]
-    for i in range(1, num_games):
-        sensors.append(RetroAchievementsRecentGameSensor(ra_data, i))
-
-    async_add_entities(sensors, update_before_add=True)
+    # The client and its budget are shared, so only one entry shows their sensors
+    if hass.data[DOMAIN].setdefault(DATA_API_SENSORS_ENTRY, entry.entry_id) == entry.entry_id:
+        sensors += [
+            RetroAchievementsApiRequestsSensor(coordinator),
+            RetroAchievementsApiLatencySensor(coordinator),
+        ]
+    for i in range(1, coordinator.num_games):
+        sensors.append(RetroAchievementsRecentGameSensor(coordinator, i))
+    if coordinator.ra_data.history is not None:
+        sensors += [
+            RetroAchievementsPointsTodaySensor(coordinator),
+            RetroAchievementsPointsThisWeekSensor(coordinator),
+            RetroAchievementsUnlockStreakSensor(coordinator),
+            RetroAchievementsConsoleTotalsSensor(coordinator),
+        ]
+
+    friends = coordinator.friends
+    if friends is not None:
+        sensors.append(RetroAchievementsFriendsLeaderboardSensor(friends, coordinator))
+        friend_sensors = {}
+
+        @callback
+        def _async_sync_friends():
+            # Follows and unfollows show up on the next friends cycle
+            followed = friends.data or {}
+            for user in friend_sensors.keys() - followed.keys():
+                hass.async_create_task(friend_sensors.pop(user).async_remove())
+            new = {user: RetroAchievementsFriendSensor(friends, user) for user in followed if user not in friend_sensors}
+            friend_sensors.update(new)
+            if new:
+                async_add_entities(new.values())
+
+        _async_sync_friends()
+        entry.async_on_unload(friends.async_add_listener(_async_sync_friends))
+
+    async_add_entities(sensors)
@@ -0,0 +1,113 @@
+"""Services for RetroAchievements."""
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .api import RetroAchievementsApiError
+from .const import DOMAIN, SERVICE_GET_GAME_ACHIEVEMENTS
+from .coordinator import RetroAchievementsCoordinator
+from .models import achievement_details
+
+# Repeated calls (a dashboard paging through a list) reuse one fetch for this long
+GAME_ACHIEVEMENTS_TTL = timedelta(minutes=5)
+GAME_ACHIEVEMENTS_CACHE_SIZE = 32
+
+ATTR_GAME_ID = "game_id"
+ATTR_ENTRY_ID = "entry_id"
+ATTR_FILTER = "filter"
+ATTR_OFFSET = "offset"
+ATTR_LIMIT = "limit"
+
+FILTERS = {
+    "all": lambda ach: True,
+    "earned": lambda ach: ach["earned"],
+    "unearned": lambda ach: not ach["earned"],
+    "earned_hardcore": lambda ach: ach["earned_hardcore"],
+    "unearned_hardcore": lambda ach: not ach["earned_hardcore"],
+}
+
+GET_GAME_ACHIEVEMENTS_SCHEMA = vol.Schema({
+    vol.Required(ATTR_GAME_ID): cv.positive_int,
+    vol.Optional(ATTR_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_FILTER, default="all"): vol.In(list(FILTERS)),
+    vol.Optional(ATTR_OFFSET, default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    vol.Optional(ATTR_LIMIT, default=50): vol.All(vol.Coerce(int), vol.Range(min=1, max=500)),
+})
+
+
+def _coordinator(hass: HomeAssistant, entry_id=None) -> RetroAchievementsCoordinator:
+    coordinators = {
+        key: value for key, value in hass.data.get(DOMAIN, {}).items()
+        if isinstance(value, RetroAchievementsCoordinator)
+    }
+    if entry_id is not None:
+        if entry_id not in coordinators:
+            raise ServiceValidationError(f"No loaded RetroAchievements entry {entry_id}")
+        return coordinators[entry_id]
+    if not coordinators:
+        raise ServiceValidationError("No RetroAchievements account is set up")
+    return next(iter(coordinators.values()))
+
+
+async def async_setup_services(hass: HomeAssistant):
+    cache = OrderedDict()
+
+    async def _async_game_achievements(coordinator, game_id):
+        key = (coordinator.username, game_id)
+        cached = cache.get(key)
+        if cached and time.monotonic() < cached[0]:
+            cache.move_to_end(key)
+            return cached[1]
+
+        try:
+            badge_data = await coordinator.ra_data.account.async_get_game_info_and_user_progress(game_id)
+        except RetroAchievementsApiError as e:
+            raise HomeAssistantError(f"Could not fetch achievements for game {game_id}: {e}") from e
+        if not isinstance(badge_data, dict):
+            badge_data = {}
+        result = {
+            "title": badge_data.get("Title"),
+            "console": badge_data.get("ConsoleName"),
+            "completion": badge_data.get("UserCompletion"),
+            "completion_hardcore": badge_data.get("UserCompletionHardcore"),
+            "achievements": achievement_details(badge_data),
+        }
+
+        cache[key] = (time.monotonic() + GAME_ACHIEVEMENTS_TTL.total_seconds(), result)
+        cache.move_to_end(key)
+        while len(cache) > GAME_ACHIEVEMENTS_CACHE_SIZE:
+            cache.popitem(last=False)
+        return result
+
+    async def async_get_game_achievements(call: ServiceCall):
+        coordinator = _coordinator(hass, call.data.get(ATTR_ENTRY_ID))
+        game_id = call.data[ATTR_GAME_ID]
+        game = await _async_game_achievements(coordinator, game_id)
+
+        matching = [ach for ach in game["achievements"] if FILTERS[call.data[ATTR_FILTER]](ach)]
+        offset, limit = call.data[ATTR_OFFSET], call.data[ATTR_LIMIT]
+        return {
+            "game_id": game_id,
+            "username": coordinator.username,
+            "title": game["title"],
+            "console": game["console"],
+            "completion": game["completion"],
+            "completion_hardcore": game["completion_hardcore"],
+            "total": len(matching),
+            "offset": offset,
+            "limit": limit,
+            "achievements": matching[offset:offset + limit],
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_GAME_ACHIEVEMENTS,
+        async_get_game_achievements,
+        schema=GET_GAME_ACHIEVEMENTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
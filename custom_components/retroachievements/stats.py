@@ -0,0 +1,92 @@
+"""Per-endpoint request statistics for the diagnostic sensors and diagnostics download."""
+import math
+from collections import deque
+
+# Latency percentiles are taken over the most recent requests only
+LATENCY_SAMPLES = 200
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of samples, or None when there are none."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+class EndpointStats:
+    __slots__ = ("calls", "errors", "bytes", "cache_hits", "coalesced", "latencies", "last_error")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.last_error = None
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "latency_p50_ms": _ms(percentile(self.latencies, 50)),
+            "latency_p90_ms": _ms(percentile(self.latencies, 90)),
+            "latency_p99_ms": _ms(percentile(self.latencies, 99)),
+            "last_error": self.last_error,
+        }
+
+
+class ApiStats:
+    """Counters kept by the shared client since Home Assistant started.
+
+    A call is a request that actually went out; cache hits and coalesced
+    requests were answered without one.
+    """
+
+    def __init__(self):
+        self.endpoints = {}
+
+    def _endpoint(self, endpoint):
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+    def record_call(self, endpoint, latency, size=0, error=None):
+        stats = self._endpoint(endpoint)
+        stats.calls += 1
+        stats.bytes += size
+        stats.latencies.append(latency)
+        if error is not None:
+            stats.errors += 1
+            stats.last_error = error
+
+    def record_cache_hit(self, endpoint):
+        self._endpoint(endpoint).cache_hits += 1
+
+    def record_coalesced(self, endpoint):
+        self._endpoint(endpoint).coalesced += 1
+
+    @property
+    def calls(self):
+        return sum(stats.calls for stats in self.endpoints.values())
+
+    @property
+    def errors(self):
+        return sum(stats.errors for stats in self.endpoints.values())
+
+    def latency_ms(self, pct):
+        """Latency percentile across every endpoint."""
+        samples = [latency for stats in self.endpoints.values() for latency in stats.latencies]
+        return _ms(percentile(samples, pct))
+
+    def as_dict(self):
+        return {endpoint: stats.as_dict() for endpoint, stats in sorted(self.endpoints.items())}